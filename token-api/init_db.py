@@ -78,6 +78,10 @@ def init_database():
 
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_instances_status ON claude_instances(status)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_instances_device ON claude_instances(device_id)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_instances_live
+          ON claude_instances(status, is_subagent) WHERE status IN ('processing', 'idle')
+    """)
 
     # Create devices table
     cursor.execute("""
@@ -130,6 +134,7 @@ def init_database():
             task_id TEXT NOT NULL,
             status TEXT NOT NULL,
             started_at TIMESTAMP NOT NULL,
+            started_at_epoch INTEGER,
             completed_at TIMESTAMP,
             duration_ms INTEGER,
             result TEXT,
@@ -146,11 +151,20 @@ def init_database():
         CREATE TABLE IF NOT EXISTS task_locks (
             task_id TEXT PRIMARY KEY,
             locked_at TIMESTAMP NOT NULL,
+            locked_at_epoch INTEGER,
             locked_by TEXT,
             FOREIGN KEY (task_id) REFERENCES scheduled_tasks(id)
         )
     """)
 
+    # Migration: Unix-epoch shadow columns for task timestamps
+    cursor.execute("PRAGMA table_info(task_executions)")
+    if 'started_at_epoch' not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE task_executions ADD COLUMN started_at_epoch INTEGER")
+    cursor.execute("PRAGMA table_info(task_locks)")
+    if 'locked_at_epoch' not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE task_locks ADD COLUMN locked_at_epoch INTEGER")
+
     # Create audio_proxy_state table (for phone audio routing through PC)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS audio_proxy_state (
@@ -13,20 +13,28 @@ import re
 import uuid
 import json
 import time
+import sys
+import queue
+import atexit
 import signal
+import threading
 import random
 import asyncio
 import functools
+import itertools
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent / ".env")
 
+import sqlite3
 import aiosqlite
+import orjson
 from fastapi import FastAPI, HTTPException, Request, UploadFile, File
 from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
@@ -34,7 +42,7 @@ import subprocess
 import tempfile
 import requests
 import httpx
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
@@ -49,13 +57,29 @@ logger = logging.getLogger("token_api")
 logger.setLevel(logging.INFO)
 
 # ============ Server-side Log Buffer ============
-from collections import deque
+from collections import Counter, OrderedDict, deque
 from urllib.parse import quote
 from typing import Deque
 
 # Circular buffer to store recent log entries (max 100)
 log_buffer: Deque[dict] = deque(maxlen=100)
 
+# (epoch second, formatted) for _fast_ts; one tuple so the listener thread and
+# crash handlers never see a second paired with another second's string
+_last_ts: tuple[int, str] = (0, "")
+
+
+def _fast_ts(ts: Optional[float] = None) -> str:
+    """Return 'YYYY-mm-dd HH:MM:SS' for ts (default now), cached per second."""
+    global _last_ts
+    sec = int(time.time() if ts is None else ts)
+    cached_sec, cached_str = _last_ts
+    if sec == cached_sec:
+        return cached_str
+    formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+    _last_ts = (sec, formatted)
+    return formatted
+
 
 class LogBufferHandler(logging.Handler):
     """Custom logging handler that captures logs to circular buffer."""
@@ -63,10 +87,16 @@ class LogBufferHandler(logging.Handler):
     def emit(self, record: logging.LogRecord):
         """Capture log record to buffer with timestamp, level, and message."""
         try:
+            # The formatter is plain '%(message)s', so only records carrying a
+            # traceback need the full Formatter.format pass
+            if record.exc_info or record.exc_text or record.stack_info:
+                message = self.format(record)
+            else:
+                message = record.getMessage()
             log_entry = {
-                "timestamp": datetime.fromtimestamp(record.created).strftime("%H:%M:%S"),
+                "timestamp": _fast_ts(record.created)[11:],
                 "level": record.levelname,
-                "message": self.format(record)
+                "message": message
             }
             log_buffer.append(log_entry)
         except Exception:
@@ -74,11 +104,10 @@ class LogBufferHandler(logging.Handler):
             pass
 
 
-# Add buffer handler to logger
+# Buffer handler (attached to token_api via the queue listener below)
 buffer_handler = LogBufferHandler()
 buffer_handler.setLevel(logging.DEBUG)
 buffer_handler.setFormatter(logging.Formatter('%(message)s'))
-logger.addHandler(buffer_handler)
 
 # Also capture uvicorn and fastapi logs
 uvicorn_logger = logging.getLogger("uvicorn")
@@ -87,9 +116,24 @@ uvicorn_logger.addHandler(buffer_handler)
 fastapi_logger = logging.getLogger("fastapi")
 fastapi_logger.addHandler(buffer_handler)
 
+# Route token_api records through a queue so formatting and stdout I/O happen on
+# the listener thread instead of blocking the event loop. Everything reaches the
+# buffer; only console_logger (the startup/scheduler lines that used to be
+# print()s) is echoed to stdout.
+console_logger = logging.getLogger("token_api.console")
+stdout_handler = logging.StreamHandler(sys.stdout)
+stdout_handler.setFormatter(logging.Formatter('%(message)s'))
+stdout_handler.addFilter(logging.Filter(console_logger.name))
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(log_queue))
+log_listener = QueueListener(log_queue, buffer_handler, stdout_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 
 # Configuration
 DB_PATH = Path(os.environ.get("TOKEN_API_DB", Path.home() / ".claude" / "agents.db"))
+DB_PATH_STR = os.fspath(DB_PATH)  # str form for sqlite drivers (skips per-connect fspath)
 DEFAULT_SESSIONS_DIR = Path.home() / "Imperium-ENV" / "Terra" / "Sessions"
 SERVER_PORT = 7777  # Authoritative port for Token API
 CRASH_LOG_PATH = Path.home() / ".claude" / "token-api-crash.log"
@@ -98,14 +142,13 @@ STASH_MAX_AGE_HOURS = 24
 
 
 # ============ Crash Logging ============
-import sys
 import traceback
 
 
 def log_crash(exc_type, exc_value, exc_tb, context: str = "unhandled"):
     """Write crash info to persistent file for post-mortem debugging."""
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _fast_ts()
         tb_lines = traceback.format_exception(exc_type, exc_value, exc_tb)
         tb_str = "".join(tb_lines)
 
@@ -137,7 +180,7 @@ def _asyncio_exception_handler(loop, context):
     else:
         # Log context message if no exception object
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = _fast_ts()
             with open(CRASH_LOG_PATH, "a") as f:
                 f.write(f"\n{'='*60}\n")
                 f.write(f"ASYNCIO ERROR at {timestamp}\n")
@@ -162,7 +205,7 @@ DEVICE_IPS = {
     "127.0.0.1": "Mac-Mini",         # Mac Mini (localhost)
 }
 
-# Voice pool: foreign-accent voices are the primary pool, assigned via linear probe.
+# Voice pool: foreign-accent voices are the primary pool, assigned at random among free voices.
 # US English voices (David, Zira, Mark) are fallback-only when pool is exhausted.
 # Ultimate fallback if everything is taken: David.
 PROFILES = [
@@ -187,6 +230,12 @@ FALLBACK_VOICES = [
 # Ultimate fallback when even fallback voices are exhausted
 ULTIMATE_FALLBACK = {"name": "fallback_david", "wsl_voice": "Microsoft David", "wsl_rate": 1, "mac_voice": "Daniel", "notification_sound": "chimes.wav", "color": "#666666"}
 
+# Precomputed voice lookups (the pools are static, so build these once)
+PROFILE_VOICES = tuple(p["wsl_voice"] for p in PROFILES)
+PROFILE_VOICE_SET = frozenset(PROFILE_VOICES)
+PROFILE_BY_VOICE = {p["wsl_voice"]: p for p in PROFILES}
+ALL_WSL_VOICES = frozenset(PROFILE_VOICES) | {fb["wsl_voice"] for fb in FALLBACK_VOICES}
+
 # Scheduler instance
 scheduler = AsyncIOScheduler()
 
@@ -195,7 +244,12 @@ cron_engine: CronEngine = None
 
 
 # Pydantic Models
-class InstanceRegisterRequest(BaseModel):
+class FastModel(BaseModel):
+    """Base for request/response models: immutable once validated (handlers never mutate them)."""
+    model_config = ConfigDict(frozen=True)
+
+
+class InstanceRegisterRequest(FastModel):
     instance_id: str
     origin_type: str = "local"  # 'local' or 'ssh'
     source_ip: Optional[str] = None
@@ -205,7 +259,7 @@ class InstanceRegisterRequest(BaseModel):
     working_dir: Optional[str] = None
 
 
-class InstanceResponse(BaseModel):
+class InstanceResponse(FastModel):
     id: str
     session_id: str
     tab_name: Optional[str]
@@ -223,23 +277,23 @@ class InstanceResponse(BaseModel):
     stopped_at: Optional[str]
 
 
-class ActivityRequest(BaseModel):
+class ActivityRequest(FastModel):
     action: str  # "prompt_submit" or "stop"
 
 
-class ProfileResponse(BaseModel):
+class ProfileResponse(FastModel):
     session_id: str
     profile: dict
 
 
-class DashboardResponse(BaseModel):
+class DashboardResponse(FastModel):
     instances: List[dict]
     productivity_active: bool
     recent_events: List[dict]
     tts_queue: Optional[dict] = None  # TTS queue status
 
 
-class TaskResponse(BaseModel):
+class TaskResponse(FastModel):
     id: str
     name: str
     description: Optional[str]
@@ -251,13 +305,13 @@ class TaskResponse(BaseModel):
     next_run: Optional[str] = None
 
 
-class TaskUpdateRequest(BaseModel):
+class TaskUpdateRequest(FastModel):
     schedule: Optional[str] = None
     enabled: Optional[bool] = None
     max_retries: Optional[int] = None
 
 
-class TaskExecutionResponse(BaseModel):
+class TaskExecutionResponse(FastModel):
     id: int
     task_id: str
     status: str
@@ -268,7 +322,7 @@ class TaskExecutionResponse(BaseModel):
     retry_count: int
 
 
-class NotifyRequest(BaseModel):
+class NotifyRequest(FastModel):
     message: str
     device_id: Optional[str] = None  # If None, notify based on active instances
     instance_id: Optional[str] = None  # Notify specific instance's device
@@ -276,18 +330,18 @@ class NotifyRequest(BaseModel):
     sound: Optional[str] = None  # Override sound file
 
 
-class TTSRequest(BaseModel):
+class TTSRequest(FastModel):
     message: str
     voice: Optional[str] = None
     rate: int = 0  # -10 to 10, 0 is normal speed
     instance_id: Optional[str] = None  # Track which instance triggered TTS
 
 
-class SoundRequest(BaseModel):
+class SoundRequest(FastModel):
     sound_file: Optional[str] = None  # Path to sound file
 
 
-class WindowCheckRequest(BaseModel):
+class WindowCheckRequest(FastModel):
     """Request to check if a window should be allowed or closed."""
     window_title: Optional[str] = None  # e.g., "YouTube - Brave"
     exe_name: Optional[str] = None  # e.g., "brave.exe"
@@ -296,7 +350,7 @@ class WindowCheckRequest(BaseModel):
 
 # ============ Audio Proxy Models ============
 
-class AudioProxyState(BaseModel):
+class AudioProxyState(FastModel):
     """Current state of the audio proxy system."""
     phone_connected: bool = False
     receiver_running: bool = False
@@ -305,14 +359,14 @@ class AudioProxyState(BaseModel):
     last_disconnect_time: Optional[str] = None
 
 
-class AudioProxyConnectRequest(BaseModel):
+class AudioProxyConnectRequest(FastModel):
     """Request when phone connects to PC Bluetooth."""
     phone_device_id: str = "Token-S24"
     bluetooth_device_name: Optional[str] = None
     source: str = "macrodroid"
 
 
-class AudioProxyConnectResponse(BaseModel):
+class AudioProxyConnectResponse(FastModel):
     """Response after processing connect request."""
     success: bool
     action: str  # "connected", "already_connected", "error"
@@ -321,13 +375,13 @@ class AudioProxyConnectResponse(BaseModel):
     message: str
 
 
-class AudioProxyDisconnectRequest(BaseModel):
+class AudioProxyDisconnectRequest(FastModel):
     """Request when phone disconnects from PC Bluetooth."""
     phone_device_id: str = "Token-S24"
     source: str = "macrodroid"
 
 
-class AudioProxyStatusResponse(BaseModel):
+class AudioProxyStatusResponse(FastModel):
     """Response for status query."""
     phone_connected: bool
     receiver_running: bool
@@ -336,7 +390,7 @@ class AudioProxyStatusResponse(BaseModel):
     last_disconnect_time: Optional[str] = None
 
 
-class WindowEnforceResponse(BaseModel):
+class WindowEnforceResponse(FastModel):
     """Response for window enforcement decision."""
     productivity_active: bool
     active_instance_count: int
@@ -345,18 +399,18 @@ class WindowEnforceResponse(BaseModel):
     reason: str
 
 
-class StashContentRequest(BaseModel):
+class StashContentRequest(FastModel):
     content: str
 
 
-class DesktopDetectionRequest(BaseModel):
+class DesktopDetectionRequest(FastModel):
     """Request from AHK desktop detection."""
     detected_mode: str  # "video" | "music" | "gaming" | "silence"
     window_title: Optional[str] = None
     source: str = "ahk"
 
 
-class DesktopDetectionResponse(BaseModel):
+class DesktopDetectionResponse(FastModel):
     """Response for desktop detection."""
     action: str  # "mode_changed" | "blocked" | "none"
     detected_mode: str
@@ -370,14 +424,14 @@ class DesktopDetectionResponse(BaseModel):
 
 # ============ Phone Activity Models ============
 
-class PhoneActivityRequest(BaseModel):
+class PhoneActivityRequest(FastModel):
     """Request from MacroDroid for phone app activity."""
     app: str  # App name: "twitter", "youtube", "game", or app package name
     action: str = "open"  # "open" | "close"
     package: Optional[str] = None  # Optional package name for games
 
 
-class PhoneActivityResponse(BaseModel):
+class PhoneActivityResponse(FastModel):
     """Response for phone activity detection."""
     allowed: bool
     reason: str  # "break_time_available", "productivity_active", "blocked", "closed"
@@ -385,7 +439,7 @@ class PhoneActivityResponse(BaseModel):
     message: Optional[str] = None
 
 
-class PhoneSystemEventRequest(BaseModel):
+class PhoneSystemEventRequest(FastModel):
     """Request from MacroDroid for phone system events (Shizuku, boot, heartbeat, telemetry).
 
     Supports two formats:
@@ -402,7 +456,7 @@ class PhoneSystemEventRequest(BaseModel):
 
 # ============ Headless Mode Models ============
 
-class HeadlessStatusResponse(BaseModel):
+class HeadlessStatusResponse(FastModel):
     """Response for headless mode status."""
     enabled: bool
     last_changed: Optional[str] = None
@@ -411,13 +465,13 @@ class HeadlessStatusResponse(BaseModel):
     auto_disable_at: Optional[str] = None  # ISO timestamp when headless will auto-disable
 
 
-class HeadlessControlRequest(BaseModel):
+class HeadlessControlRequest(FastModel):
     """Request to control headless mode."""
     action: str = "toggle"  # "toggle" | "enable" | "disable"
     duration_hours: Optional[float] = None  # Auto-disable after N hours
 
 
-class HeadlessControlResponse(BaseModel):
+class HeadlessControlResponse(FastModel):
     """Response after controlling headless mode."""
     success: bool
     action: str
@@ -428,14 +482,14 @@ class HeadlessControlResponse(BaseModel):
 
 # ============ System Control Models ============
 
-class ShutdownRequest(BaseModel):
+class ShutdownRequest(FastModel):
     """Request to shutdown/restart the system."""
     action: str = "shutdown"  # "shutdown" | "restart"
     delay_seconds: int = 0  # Delay before shutdown (0 = immediate)
     force: bool = False  # Force close applications
 
 
-class ShutdownResponse(BaseModel):
+class ShutdownResponse(FastModel):
     """Response after initiating shutdown."""
     success: bool
     action: str
@@ -445,20 +499,20 @@ class ShutdownResponse(BaseModel):
 
 # ============ Claude Code Hook Models ============
 
-class HookResponse(BaseModel):
+class HookResponse(FastModel):
     """Standard response for hook handlers."""
     success: bool = True
     action: str
     details: Optional[dict] = None
 
 
-class PreToolUseResponse(BaseModel):
+class PreToolUseResponse(FastModel):
     """Response for PreToolUse hooks that can block operations."""
     permissionDecision: Optional[str] = None  # "allow" or "deny"
     permissionDecisionReason: Optional[str] = None
 
 
-class DiscordMessageRequest(BaseModel):
+class DiscordMessageRequest(FastModel):
     """Forwarded Discord message from the discord-cli daemon."""
     message_id: Optional[str] = None
     channel_id: str
@@ -474,7 +528,7 @@ class DiscordMessageRequest(BaseModel):
     embeds: Optional[int] = 0
 
 
-class InboxNotifyRequest(BaseModel):
+class InboxNotifyRequest(FastModel):
     """Gene-seed birth notification for a new inbox note."""
     path: str
     title: str
@@ -482,7 +536,7 @@ class InboxNotifyRequest(BaseModel):
     source: str = "obsidian"
 
 
-class InboxCreateRequest(BaseModel):
+class InboxCreateRequest(FastModel):
     """Create an aspirant note from external source (Discord, API, hotkey)."""
     title: str = ""
     type: str = "capture"
@@ -491,20 +545,20 @@ class InboxCreateRequest(BaseModel):
     author: Optional[str] = None
 
 
-class SessionDocCreateRequest(BaseModel):
+class SessionDocCreateRequest(FastModel):
     title: str
     project: Optional[str] = None
     file_path: Optional[str] = None
     primarch_name: Optional[str] = None
 
 
-class SessionDocUpdateRequest(BaseModel):
+class SessionDocUpdateRequest(FastModel):
     title: Optional[str] = None
     project: Optional[str] = None
     status: Optional[str] = None
 
 
-class SessionDocMergeRequest(BaseModel):
+class SessionDocMergeRequest(FastModel):
     content: str
     source: str = "agent"
     context: Optional[str] = None
@@ -516,376 +570,580 @@ _post_tool_debounce: dict = {}  # session_id -> last_call_time
 
 # Tracks background Task subagents still awaiting result delivery.
 # Incremented in handle_pre_tool_use, decremented in handle_prompt_submit.
-_pending_background_tasks: dict = {}  # session_id -> count
+# Hook handlers mutate these without awaiting in between, so the event loop
+# already serializes them; no lock needed.
+_pending_background_tasks: Counter = Counter()  # session_id -> count
 
 
-# Database helper: connect with busy_timeout to prevent indefinite blocking
-async def get_db():
-    """Get a database connection with busy_timeout configured."""
-    db = await aiosqlite.connect(DB_PATH)
-    await db.execute("PRAGMA busy_timeout=5000")
-    return db
+SQL_STATEMENT_CACHE_SIZE = 512
 
+# Shared long-lived connection, opened in lifespan. A single sqlite connection
+# can't interleave transactions from concurrent requests, so each
+# db_connection() block holds _shared_db_lock for its duration (re-entrant for
+# the owning task, so helpers like log_event can nest inside a block).
+_shared_db: Optional[aiosqlite.Connection] = None
+_shared_db_lock = asyncio.Lock()
+_shared_db_owner: Optional[asyncio.Task] = None
 
-# Database initialization
-async def init_db():
-    """Initialize SQLite database with required tables."""
+# Read-only connections for the polled read endpoints (dashboard, instance and
+# event lists). WAL lets them read alongside the shared connection instead of
+# queueing on _shared_db_lock behind writes. Opened and closed with it.
+DB_READER_COUNT = 4
+_db_readers: Optional[asyncio.Queue] = None
+
+
+async def open_shared_db():
+    """Open the shared connection used by db_connection() and the reader pool."""
+    global _shared_db, _db_readers
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # sqlite3 keeps an LRU of prepared statements per connection (128 by
+    # default); this file issues a few hundred distinct queries, so a larger
+    # cache keeps the hot ones parsed on the long-lived connection
+    _shared_db = await aiosqlite.connect(DB_PATH_STR, cached_statements=SQL_STATEMENT_CACHE_SIZE)
+    # WAL lets the TUI/agents-db readers proceed while we write; NORMAL sync is
+    # durable across app crashes in WAL mode (only an OS crash can lose the tail)
+    for pragma in (
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-64000",
+        "PRAGMA mmap_size=268435456",
+    ):
+        await _shared_db.execute(pragma)
+    await _shared_db.commit()
+
+    readers = asyncio.Queue()
+    reader_uri = f"{DB_PATH.resolve().as_uri()}?mode=ro"
+    for _ in range(DB_READER_COUNT):
+        reader = await aiosqlite.connect(reader_uri, uri=True, cached_statements=SQL_STATEMENT_CACHE_SIZE)
+        for pragma in (
+            "PRAGMA busy_timeout=5000",
+            "PRAGMA temp_store=MEMORY",
+            "PRAGMA cache_size=-16000",
+            "PRAGMA mmap_size=268435456",
+        ):
+            await reader.execute(pragma)
+        readers.put_nowait(reader)
+    _db_readers = readers
+
+
+async def close_shared_db():
+    """Close the shared connection, the reader pool and the sync pool (lifespan shutdown)."""
+    global _shared_db, _db_readers
+    if _db_readers is not None:
+        readers, _db_readers = _db_readers, None
+        # Wait for borrowed readers to come back before closing them
+        for _ in range(DB_READER_COUNT):
+            await (await readers.get()).close()
+    if _shared_db is not None:
+        async with _shared_db_lock:
+            db, _shared_db = _shared_db, None
+            # Refresh planner statistics for the long-lived connection's queries
+            await db.execute("PRAGMA optimize")
+            await db.close()
+    while True:
+        try:
+            _sync_db_pool.get_nowait().close()
+        except queue.Empty:
+            break
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        # Set busy_timeout to prevent blocking on lock contention
-        await db.execute("PRAGMA busy_timeout=5000")
-        # Create claude_instances table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS claude_instances (
-                id TEXT PRIMARY KEY,
-                session_id TEXT UNIQUE NOT NULL,
-                tab_name TEXT,
-                working_dir TEXT,
-                origin_type TEXT NOT NULL,
-                source_ip TEXT,
-                device_id TEXT NOT NULL,
-                profile_name TEXT,
-                tts_voice TEXT,
-                notification_sound TEXT,
-                pid INTEGER,
-                status TEXT DEFAULT 'idle',
-                is_processing INTEGER DEFAULT 0,
-                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                stopped_at TIMESTAMP
-            )
-        """)
 
-        # Migration: add is_processing column if it doesn't exist
-        cursor = await db.execute("PRAGMA table_info(claude_instances)")
-        columns = [col[1] for col in await cursor.fetchall()]
-        if 'is_processing' not in columns:
-            await db.execute("ALTER TABLE claude_instances ADD COLUMN is_processing INTEGER DEFAULT 0")
-        if 'working_dir' not in columns:
-            await db.execute("ALTER TABLE claude_instances ADD COLUMN working_dir TEXT")
-        if 'tts_mode' not in columns:
-            await db.execute("ALTER TABLE claude_instances ADD COLUMN tts_mode TEXT DEFAULT 'verbose'")
-        if 'session_doc_id' not in columns:
-            await db.execute("ALTER TABLE claude_instances ADD COLUMN session_doc_id INTEGER")
-
-        # Migration: add primarch_name to session_documents
-        cursor = await db.execute("PRAGMA table_info(session_documents)")
-        sd_columns = [col[1] for col in await cursor.fetchall()]
-        if 'primarch_name' not in sd_columns:
-            await db.execute("ALTER TABLE session_documents ADD COLUMN primarch_name TEXT")
-
-        # Migration: Convert two-field status (status + is_processing) to single enum
-        # Old: status='active' + is_processing=0/1 → New: status='processing'/'idle'/'stopped'
-        cursor = await db.execute("SELECT COUNT(*) FROM claude_instances WHERE status = 'active'")
-        if (await cursor.fetchone())[0] > 0:
-            await db.execute("""
-                UPDATE claude_instances SET status = CASE
-                    WHEN status = 'active' AND is_processing = 1 THEN 'processing'
-                    WHEN status = 'active' AND is_processing = 0 THEN 'idle'
-                    ELSE status
-                END
-            """)
-            await db.commit()
+@asynccontextmanager
+async def db_connection():
+    """Yield a database connection for one unit of work.
 
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_instances_status ON claude_instances(status)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_instances_device ON claude_instances(device_id)")
+    Uses the shared connection when the lifespan has opened it, otherwise falls
+    back to a short-lived connection (scripts, tests without lifespan). As with
+    a per-request connection, uncommitted work is rolled back on exit and
+    row_factory changes don't leak to the next user.
+    """
+    global _shared_db_owner
+    if _shared_db is None:
+        async with aiosqlite.connect(DB_PATH_STR) as db:
+            yield db
+        return
 
-        # Create devices table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS devices (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                tailscale_ip TEXT UNIQUE,
-                notification_method TEXT,
-                webhook_url TEXT,
-                tts_engine TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+    db = _shared_db
+    task = asyncio.current_task()
+    if _shared_db_owner is task:
+        # Nested use from the task that already holds the connection
+        row_factory = db.row_factory
+        try:
+            yield db
+        finally:
+            db.row_factory = row_factory
+        return
 
-        # Create events table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_type TEXT NOT NULL,
-                instance_id TEXT,
-                device_id TEXT,
-                details TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+    async with _shared_db_lock:
+        _shared_db_owner = task
+        try:
+            yield db
+        finally:
+            _shared_db_owner = None
+            db.row_factory = None
+            if db.in_transaction:
+                await db.rollback()
 
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_events_time ON events(created_at DESC)")
 
-        # Create scheduled_tasks table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS scheduled_tasks (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT,
-                task_type TEXT NOT NULL,
-                schedule TEXT NOT NULL,
-                enabled INTEGER DEFAULT 1,
-                max_retries INTEGER DEFAULT 0,
-                retry_delay_seconds INTEGER DEFAULT 60,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+@asynccontextmanager
+async def db_reader():
+    """Yield a read-only connection for a query-only unit of work.
 
-        # Create task_executions table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS task_executions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id TEXT NOT NULL,
-                status TEXT NOT NULL,
-                started_at TIMESTAMP NOT NULL,
-                completed_at TIMESTAMP,
-                duration_ms INTEGER,
-                result TEXT,
-                retry_count INTEGER DEFAULT 0,
-                FOREIGN KEY (task_id) REFERENCES scheduled_tasks(id)
-            )
-        """)
+    Falls back to db_connection() when the lifespan hasn't opened the reader
+    pool (scripts, tests without lifespan).
+    """
+    readers = _db_readers
+    if readers is None:
+        async with db_connection() as db:
+            yield db
+        return
 
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_task_executions_task_id ON task_executions(task_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_task_executions_started_at ON task_executions(started_at)")
+    db = await readers.get()
+    try:
+        yield db
+    finally:
+        db.row_factory = None
+        readers.put_nowait(db)
 
-        # Create task_locks table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS task_locks (
-                task_id TEXT PRIMARY KEY,
-                locked_at TIMESTAMP NOT NULL,
-                locked_by TEXT,
-                FOREIGN KEY (task_id) REFERENCES scheduled_tasks(id)
-            )
-        """)
 
-        # Create audio_proxy_state table (for phone audio routing through PC)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS audio_proxy_state (
-                id INTEGER PRIMARY KEY DEFAULT 1,
-                phone_connected INTEGER DEFAULT 0,
-                receiver_running INTEGER DEFAULT 0,
-                receiver_pid INTEGER,
-                last_connect_time TEXT,
-                last_disconnect_time TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                CHECK (id = 1)
-            )
-        """)
+# Pool of sqlite3 connections for the timer's asyncio.to_thread helpers, which
+# run on arbitrary executor threads (hence check_same_thread=False; each
+# connection is only used by one borrower at a time). Like db_connection(), it
+# only pools while the lifespan has the shared connection open.
+_sync_db_pool: queue.SimpleQueue = queue.SimpleQueue()
 
-        # Create timer_state table (single-row, stores timer engine state as JSON)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS timer_state (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                state_json TEXT NOT NULL,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
 
-        # Timer session logging - track work/break sessions
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS timer_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP,
-                mode TEXT NOT NULL,
-                duration_ms INTEGER DEFAULT 0,
-                break_earned_ms INTEGER DEFAULT 0,
-                break_used_ms INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+@contextmanager
+def sync_db_connection():
+    """Borrow a sqlite3 connection for one unit of work in a worker thread."""
+    pooled = _shared_db is not None
+    try:
+        conn = _sync_db_pool.get_nowait() if pooled else None
+    except queue.Empty:
+        conn = None
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH_STR, check_same_thread=False, cached_statements=SQL_STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    try:
+        yield conn
+    finally:
+        conn.row_factory = None
+        if conn.in_transaction:
+            conn.rollback()
+        if pooled:
+            _sync_db_pool.put(conn)
+        else:
+            conn.close()
 
-        # Timer mode changes - track when mode changed
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS timer_mode_changes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP NOT NULL,
-                old_mode TEXT,
-                new_mode TEXT NOT NULL,
-                is_automatic INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
 
-        # Timer daily scores - track productivity over time
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS timer_daily_scores (
-                date TEXT PRIMARY KEY,
-                productivity_score INTEGER,
-                total_work_ms INTEGER DEFAULT 0,
-                total_break_used_ms INTEGER DEFAULT 0,
-                session_count INTEGER DEFAULT 0,
-                mode_change_count INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+# In-memory live-instance count for the AHK polling paths (/desktop,
+# /api/window/enforce). Every in-process status mutation calls
+# invalidate_active_count(); the TTL bounds staleness from external writers
+# (instances-clear, agents-db) that bypass the API.
+ACTIVE_COUNT_TTL = 5.0  # seconds
+# GET /api/window/enforce reuses its last response (and skips re-logging the
+# check) for this long; status changes drop it along with the count
+ENFORCE_RESPONSE_TTL = 0.25  # seconds
+# generation is bumped on every invalidation so a count read that raced a
+# commit isn't stored over it
+INSTANCE_STATE = {"active_count": None, "counted_at": 0.0, "generation": 0, "enforce_response": None, "enforce_at": 0.0}
 
-        # Create checkins table (productivity check-in responses)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS checkins (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                checkin_type TEXT NOT NULL,
-                date TEXT NOT NULL,
-                energy INTEGER,
-                focus INTEGER,
-                mood TEXT,
-                plan TEXT,
-                notes TEXT,
-                on_track INTEGER,
-                source TEXT DEFAULT 'discord',
-                prompted_at TIMESTAMP NOT NULL,
-                responded_at TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(checkin_type, date)
-            )
-        """)
 
-        # Create nudges table (Phase 2 - idle detection nudges)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS nudges (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nudge_type TEXT NOT NULL,
-                message TEXT NOT NULL,
-                idle_minutes REAL,
-                acknowledged INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+def invalidate_active_count():
+    """Drop the cached live-instance count (call after any status change).
 
-        # Timer shifts analytics table (daily-wiped, rich metadata)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS timer_shifts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                old_mode TEXT,
-                new_mode TEXT NOT NULL,
-                trigger TEXT,
-                source TEXT,
-                break_balance_ms INTEGER,
-                break_backlog_ms INTEGER,
-                work_time_ms INTEGER,
-                active_instances INTEGER,
-                phone_app TEXT,
-                details TEXT
-            )
-        """)
+    Call it after the commit: the count is re-read through db_reader(), whose
+    connections can't see the writer's uncommitted rows.
+    """
+    INSTANCE_STATE["active_count"] = None
+    INSTANCE_STATE["generation"] += 1
+    INSTANCE_STATE["enforce_response"] = None
+
+
+async def get_active_instance_count() -> int:
+    """Number of processing/idle instances, served from memory when fresh."""
+    count = INSTANCE_STATE["active_count"]
+    if count is not None and time.monotonic() - INSTANCE_STATE["counted_at"] < ACTIVE_COUNT_TTL:
+        return count
+    generation = INSTANCE_STATE["generation"]
+    async with db_reader() as db:
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle')"
+        )
+        row = await cursor.fetchone()
+        count = row[0] if row else 0
+    # An invalidation during the read means our snapshot may predate it
+    if INSTANCE_STATE["generation"] == generation:
+        INSTANCE_STATE["active_count"] = count
+        INSTANCE_STATE["counted_at"] = time.monotonic()
+    return count
 
-        # Seed devices if not exist
-        await db.execute("""
-            INSERT OR IGNORE INTO devices (id, name, type, tailscale_ip, notification_method, tts_engine)
-            VALUES ('desktop', 'Desktop', 'local', '100.66.10.74', 'tts_sound', 'windows_sapi')
-        """)
 
-        await db.execute("""
-            INSERT OR IGNORE INTO devices (id, name, type, tailscale_ip, notification_method, webhook_url)
-            VALUES ('Token-S24', 'Pixel Phone', 'mobile', '100.102.92.24', 'webhook', 'http://100.102.92.24:7777/notify')
-        """)
+# queue_tts's per-instance (tab_name, tts_voice, notification_sound, tts_mode)
+# lookup. Endpoints that change those columns call invalidate_instance_profile();
+# the TTL bounds staleness from external writers, as with ACTIVE_COUNT_TTL.
+INSTANCE_PROFILE_TTL = 60.0  # seconds
+INSTANCE_PROFILE_CACHE: dict[str, tuple[float, tuple]] = {}
 
-        # Seed scheduled tasks
-        await db.execute("""
-            INSERT OR IGNORE INTO scheduled_tasks (id, name, description, task_type, schedule, max_retries)
-            VALUES ('cleanup_stale_instances', 'Cleanup Stale Instances',
-                    'Mark instances with no activity for 3+ hours as stopped',
-                    'interval', '30m', 2)
-        """)
 
-        await db.execute("""
-            INSERT OR IGNORE INTO scheduled_tasks (id, name, description, task_type, schedule, max_retries)
-            VALUES ('purge_old_events', 'Purge Old Events',
-                    'Delete events older than 30 days',
-                    'cron', '0 3 * * *', 1)
-        """)
+def invalidate_instance_profile(instance_id: Optional[str] = None):
+    """Drop one instance's cached TTS profile, or all of them when instance_id is None."""
+    if instance_id is None:
+        INSTANCE_PROFILE_CACHE.clear()
+    else:
+        INSTANCE_PROFILE_CACHE.pop(instance_id, None)
 
-        # Seed check-in scheduled tasks (weekdays only)
-        checkin_tasks = [
-            ("checkin_morning_start", "Morning Start Check-in", "Energy, focus, mood, and today's focus", "0 9 * * 1-5"),
-            ("checkin_mid_morning", "Mid-Morning Check-in", "Focus check and on-track status", "30 10 * * 1-5"),
-            ("checkin_decision_point", "Decision Point Check-in", "Gym or power through, energy check", "0 11 * * 1-5"),
-            ("checkin_afternoon", "Afternoon Start Check-in", "Energy and focus after lunch", "0 13 * * 1-5"),
-            ("checkin_afternoon_check", "Afternoon Check", "Energy, focus, and need help assessment", "30 14 * * 1-5"),
-        ]
-        for task_id, name, desc, schedule in checkin_tasks:
-            await db.execute("""
-                INSERT OR IGNORE INTO scheduled_tasks (id, name, description, task_type, schedule, max_retries)
-                VALUES (?, ?, ?, 'cron', ?, 0)
-            """, (task_id, name, desc, schedule))
 
-        # Cron engine tables
-        await CronEngine.init_tables(db)
+# Database initialization
+# Stored in PRAGMA user_version once init_db's migrations have run; bump it
+# when adding a migration so existing databases pick it up.
+SCHEMA_VERSION = 1
+
+# Idempotent DDL for init_db, run as one executescript (a single trip to
+# aiosqlite's worker thread). Indexes on migrated columns are created in
+# init_db after the ALTERs.
+_INIT_SCHEMA_SQL = """
+-- Create claude_instances table
+CREATE TABLE IF NOT EXISTS claude_instances (
+    id TEXT PRIMARY KEY,
+    session_id TEXT UNIQUE NOT NULL,
+    tab_name TEXT,
+    working_dir TEXT,
+    origin_type TEXT NOT NULL,
+    source_ip TEXT,
+    device_id TEXT NOT NULL,
+    profile_name TEXT,
+    tts_voice TEXT,
+    notification_sound TEXT,
+    pid INTEGER,
+    status TEXT DEFAULT 'idle',
+    is_processing INTEGER DEFAULT 0,
+    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    stopped_at TIMESTAMP
+);
+
+-- Create devices table
+CREATE TABLE IF NOT EXISTS devices (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    tailscale_ip TEXT UNIQUE,
+    notification_method TEXT,
+    webhook_url TEXT,
+    tts_engine TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create events table
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    instance_id TEXT,
+    device_id TEXT,
+    details TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events(created_at DESC);
+
+-- Create scheduled_tasks table
+CREATE TABLE IF NOT EXISTS scheduled_tasks (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    task_type TEXT NOT NULL,
+    schedule TEXT NOT NULL,
+    enabled INTEGER DEFAULT 1,
+    max_retries INTEGER DEFAULT 0,
+    retry_delay_seconds INTEGER DEFAULT 60,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create task_executions table
+CREATE TABLE IF NOT EXISTS task_executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    started_at_epoch INTEGER,
+    completed_at TIMESTAMP,
+    duration_ms INTEGER,
+    result TEXT,
+    retry_count INTEGER DEFAULT 0,
+    FOREIGN KEY (task_id) REFERENCES scheduled_tasks(id)
+);
+CREATE INDEX IF NOT EXISTS idx_task_executions_task_id ON task_executions(task_id);
+CREATE INDEX IF NOT EXISTS idx_task_executions_started_at ON task_executions(started_at);
+
+-- Create task_locks table
+CREATE TABLE IF NOT EXISTS task_locks (
+    task_id TEXT PRIMARY KEY,
+    locked_at TIMESTAMP NOT NULL,
+    locked_at_epoch INTEGER,
+    locked_by TEXT,
+    FOREIGN KEY (task_id) REFERENCES scheduled_tasks(id)
+);
+
+-- Create audio_proxy_state table (for phone audio routing through PC)
+CREATE TABLE IF NOT EXISTS audio_proxy_state (
+    id INTEGER PRIMARY KEY DEFAULT 1,
+    phone_connected INTEGER DEFAULT 0,
+    receiver_running INTEGER DEFAULT 0,
+    receiver_pid INTEGER,
+    last_connect_time TEXT,
+    last_disconnect_time TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CHECK (id = 1)
+);
+
+-- Create timer_state table (single-row, stores timer engine state as JSON)
+CREATE TABLE IF NOT EXISTS timer_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    state_json TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Timer session logging - track work/break sessions
+CREATE TABLE IF NOT EXISTS timer_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP,
+    mode TEXT NOT NULL,
+    duration_ms INTEGER DEFAULT 0,
+    break_earned_ms INTEGER DEFAULT 0,
+    break_used_ms INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Timer mode changes - track when mode changed
+CREATE TABLE IF NOT EXISTS timer_mode_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TIMESTAMP NOT NULL,
+    old_mode TEXT,
+    new_mode TEXT NOT NULL,
+    is_automatic INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Timer daily scores - track productivity over time
+CREATE TABLE IF NOT EXISTS timer_daily_scores (
+    date TEXT PRIMARY KEY,
+    productivity_score INTEGER,
+    total_work_ms INTEGER DEFAULT 0,
+    total_break_used_ms INTEGER DEFAULT 0,
+    session_count INTEGER DEFAULT 0,
+    mode_change_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create checkins table (productivity check-in responses)
+CREATE TABLE IF NOT EXISTS checkins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    checkin_type TEXT NOT NULL,
+    date TEXT NOT NULL,
+    energy INTEGER,
+    focus INTEGER,
+    mood TEXT,
+    plan TEXT,
+    notes TEXT,
+    on_track INTEGER,
+    source TEXT DEFAULT 'discord',
+    prompted_at TIMESTAMP NOT NULL,
+    responded_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(checkin_type, date)
+);
+
+-- Create nudges table (Phase 2 - idle detection nudges)
+CREATE TABLE IF NOT EXISTS nudges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nudge_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    idle_minutes REAL,
+    acknowledged INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Timer shifts analytics table (daily-wiped, rich metadata)
+CREATE TABLE IF NOT EXISTS timer_shifts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    old_mode TEXT,
+    new_mode TEXT NOT NULL,
+    trigger TEXT,
+    source TEXT,
+    break_balance_ms INTEGER,
+    break_backlog_ms INTEGER,
+    work_time_ms INTEGER,
+    active_instances INTEGER,
+    phone_app TEXT,
+    details TEXT
+);
+
+-- Agent state + guard runs tables
+CREATE TABLE IF NOT EXISTS agent_state (
+    id       TEXT PRIMARY KEY,
+    state_json TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guard_runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    cron_run_id INTEGER NOT NULL,
+    job_id      TEXT NOT NULL,
+    guard_index INTEGER NOT NULL,
+    verdict     TEXT NOT NULL,
+    findings    TEXT,
+    model       TEXT DEFAULT 'MiniMax-M2.5',
+    duration_ms INTEGER,
+    created_at  TEXT NOT NULL
+);
+
+-- Create session_documents table (persistent Obsidian notes linked to instances)
+CREATE TABLE IF NOT EXISTS session_documents (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path   TEXT NOT NULL UNIQUE,
+    title       TEXT,
+    project     TEXT,
+    primarch_name TEXT,
+    status      TEXT DEFAULT 'active',
+    created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create primarch_session_docs table (tracks primarch ↔ session doc links over time)
+CREATE TABLE IF NOT EXISTS primarch_session_docs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    primarch_name TEXT NOT NULL,
+    session_doc_id INTEGER NOT NULL,
+    linked_at     TEXT NOT NULL DEFAULT (datetime('now')),
+    unlinked_at   TEXT,
+    FOREIGN KEY (session_doc_id) REFERENCES session_documents(id)
+);
+CREATE INDEX IF NOT EXISTS idx_primarch_active
+  ON primarch_session_docs(primarch_name) WHERE unlinked_at IS NULL;
+
+-- Create primarchs table (registry of primarch identities)
+CREATE TABLE IF NOT EXISTS primarchs (
+    name            TEXT PRIMARY KEY,
+    title           TEXT NOT NULL,
+    aliases         TEXT NOT NULL DEFAULT '[]',
+    vault           TEXT NOT NULL,
+    role            TEXT NOT NULL,
+    instance_name_prefix TEXT NOT NULL,
+    vault_note_path TEXT,
+    created_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS habits (
+    id                  TEXT PRIMARY KEY,
+    name                TEXT NOT NULL,
+    category            TEXT NOT NULL,
+    window_start_hour   INTEGER NOT NULL,
+    window_end_hour     INTEGER NOT NULL,
+    notes               TEXT,
+    active              INTEGER NOT NULL DEFAULT 1,
+    created_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS habit_completions (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    habit_id    TEXT NOT NULL REFERENCES habits(id),
+    date        TEXT NOT NULL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    notes       TEXT,
+    UNIQUE(habit_id, date)
+);
+"""
 
-        # Agent state + guard runs tables
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS agent_state (
-                id       TEXT PRIMARY KEY,
-                state_json TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS guard_runs (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                cron_run_id INTEGER NOT NULL,
-                job_id      TEXT NOT NULL,
-                guard_index INTEGER NOT NULL,
-                verdict     TEXT NOT NULL,
-                findings    TEXT,
-                model       TEXT DEFAULT 'MiniMax-M2.5',
-                duration_ms INTEGER,
-                created_at  TEXT NOT NULL
-            )
-        """)
 
-        # Create session_documents table (persistent Obsidian notes linked to instances)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS session_documents (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                file_path   TEXT NOT NULL UNIQUE,
-                title       TEXT,
-                project     TEXT,
-                primarch_name TEXT,
-                status      TEXT DEFAULT 'active',
-                created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+async def init_db():
+    """Initialize SQLite database with required tables."""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-        # Create primarch_session_docs table (tracks primarch ↔ session doc links over time)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS primarch_session_docs (
-                id            INTEGER PRIMARY KEY AUTOINCREMENT,
-                primarch_name TEXT NOT NULL,
-                session_doc_id INTEGER NOT NULL,
-                linked_at     TEXT NOT NULL DEFAULT (datetime('now')),
-                unlinked_at   TEXT,
-                FOREIGN KEY (session_doc_id) REFERENCES session_documents(id)
-            )
-        """)
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_primarch_active
-              ON primarch_session_docs(primarch_name) WHERE unlinked_at IS NULL
-        """)
+    async with db_connection() as db:
+        # Set busy_timeout to prevent blocking on lock contention
+        await db.execute("PRAGMA busy_timeout=5000")
+        await db.executescript(_INIT_SCHEMA_SQL)
+
+        # The ALTER/UPDATE migrations below only need to run once per database;
+        # ones stamped with the current SCHEMA_VERSION skip them. Everything
+        # else in init_db is idempotent DDL or INSERT OR IGNORE seeding and runs
+        # every start, so new tables, cron_engine changes and seed rows still
+        # reach existing databases without a version bump.
+        cursor = await db.execute("PRAGMA user_version")
+        (user_version,) = await cursor.fetchone()
+        if user_version < SCHEMA_VERSION:
+            # Migrations: add columns that older databases are missing. ALTER on an
+            # existing column (including one just created by the schema) raises
+            # OperationalError, which is cheaper than a PRAGMA table_info round-trip.
+            for table, col_def in (
+                ("claude_instances", "is_processing INTEGER DEFAULT 0"),
+                ("claude_instances", "working_dir TEXT"),
+                ("claude_instances", "tts_mode TEXT DEFAULT 'verbose'"),
+                ("claude_instances", "session_doc_id INTEGER"),
+                ("claude_instances", "is_subagent INTEGER DEFAULT 0"),
+                ("claude_instances", "spawner TEXT"),
+                ("session_documents", "primarch_name TEXT"),
+                # Unix-epoch shadows of ISO timestamps, compared without parsing
+                ("task_executions", "started_at_epoch INTEGER"),
+                ("task_locks", "locked_at_epoch INTEGER"),
+            ):
+                try:
+                    await db.execute(f"ALTER TABLE {table} ADD COLUMN {col_def}")
+                except aiosqlite.OperationalError:
+                    pass
 
-        # Create primarchs table (registry of primarch identities)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS primarchs (
-                name            TEXT PRIMARY KEY,
-                title           TEXT NOT NULL,
-                aliases         TEXT NOT NULL DEFAULT '[]',
-                vault           TEXT NOT NULL,
-                role            TEXT NOT NULL,
-                instance_name_prefix TEXT NOT NULL,
-                vault_note_path TEXT,
-                created_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+            # Migration: Convert two-field status (status + is_processing) to single enum
+            # Old: status='active' + is_processing=0/1 → New: status='processing'/'idle'/'stopped'
+            cursor = await db.execute("SELECT COUNT(*) FROM claude_instances WHERE status = 'active'")
+            if (await cursor.fetchone())[0] > 0:
+                await db.execute("""
+                    UPDATE claude_instances SET status = CASE
+                        WHEN status = 'active' AND is_processing = 1 THEN 'processing'
+                        WHEN status = 'active' AND is_processing = 0 THEN 'idle'
+                        ELSE status
+                    END
+                """)
+                await db.commit()
+
+            await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        await db.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_instances_status ON claude_instances(status);
+            CREATE INDEX IF NOT EXISTS idx_instances_device ON claude_instances(device_id);
+            CREATE INDEX IF NOT EXISTS idx_instances_live
+              ON claude_instances(status, is_subagent) WHERE status IN ('processing', 'idle');
         """)
 
+        # Seed devices if not exist
+        await db.executemany("""
+            INSERT OR IGNORE INTO devices (id, name, type, tailscale_ip, notification_method, webhook_url, tts_engine)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            ("desktop", "Desktop", "local", "100.66.10.74", "tts_sound", None, "windows_sapi"),
+            ("Token-S24", "Pixel Phone", "mobile", "100.102.92.24", "webhook", "http://100.102.92.24:7777/notify", None),
+        ])
+
+        # Seed scheduled tasks (check-ins are weekdays only)
+        await db.executemany("""
+            INSERT OR IGNORE INTO scheduled_tasks (id, name, description, task_type, schedule, max_retries)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            ("cleanup_stale_instances", "Cleanup Stale Instances", "Mark instances with no activity for 3+ hours as stopped", "interval", "30m", 2),
+            ("purge_old_events", "Purge Old Events", "Delete events older than 30 days", "cron", "0 3 * * *", 1),
+            ("checkin_morning_start", "Morning Start Check-in", "Energy, focus, mood, and today's focus", "cron", "0 9 * * 1-5", 0),
+            ("checkin_mid_morning", "Mid-Morning Check-in", "Focus check and on-track status", "cron", "30 10 * * 1-5", 0),
+            ("checkin_decision_point", "Decision Point Check-in", "Gym or power through, energy check", "cron", "0 11 * * 1-5", 0),
+            ("checkin_afternoon", "Afternoon Start Check-in", "Energy and focus after lunch", "cron", "0 13 * * 1-5", 0),
+            ("checkin_afternoon_check", "Afternoon Check", "Energy, focus, and need help assessment", "cron", "30 14 * * 1-5", 0),
+        ])
+
+        # Cron engine tables
+        await CronEngine.init_tables(db)
+
         # Seed primarchs (INSERT OR IGNORE so existing data isn't overwritten)
         primarch_seed = [
             ("vulkan", "Vulkan, The Promethean", '["v"]', "Imperium-ENV", "Infrastructure architect and system designer. Forges artifacts meant to outlast their maker. Primarch of the Vault Mind system.", "vulkan", "Personas/Vulkan.md"),
@@ -899,35 +1157,10 @@ async def init_db():
             ("corax", "Corax, The Raven Lord", '["corax", "raven", "monitor", "codax"]', "Imperium-ENV", "Observability Primarch. Long-term monitoring, anomaly detection, pattern recognition across the entire system. Independent observer — not part of the Mechanicus command chain. Read-only. Silent by default, speaks when something is wrong.", "corax", "Personas/Corax.md"),
             ("perturabo", "Perturabo, Lord of Iron", '["pert", "iron-within", "lord-of-iron"]', "Imperium-ENV", "Matters of the flesh. Food supply chain, meal prep logistics, inventory management, health telemetry. On-demand, not cron.", "perturabo", "Personas/Perturabo.md"),
         ]
-        for p in primarch_seed:
-            await db.execute("""
-                INSERT OR IGNORE INTO primarchs (name, title, aliases, vault, role, instance_name_prefix, vault_note_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, p)
-
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS habits (
-                id                  TEXT PRIMARY KEY,
-                name                TEXT NOT NULL,
-                category            TEXT NOT NULL,
-                window_start_hour   INTEGER NOT NULL,
-                window_end_hour     INTEGER NOT NULL,
-                notes               TEXT,
-                active              INTEGER NOT NULL DEFAULT 1,
-                created_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS habit_completions (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                habit_id    TEXT NOT NULL REFERENCES habits(id),
-                date        TEXT NOT NULL,
-                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes       TEXT,
-                UNIQUE(habit_id, date)
-            )
-        """)
+        await db.executemany("""
+            INSERT OR IGNORE INTO primarchs (name, title, aliases, vault, role, instance_name_prefix, vault_note_path)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, primarch_seed)
 
         # Seed default habit definitions (INSERT OR IGNORE so existing data isn't overwritten)
         default_habits = [
@@ -942,34 +1175,125 @@ async def init_db():
             ("evening_reading",    "Reading",               "evening", 19, 24, None),
             ("evening_tomorrow",   "Tomorrow prep",         "evening", 19, 24, "Review tomorrow's calendar and tasks"),
         ]
-        for h in default_habits:
-            await db.execute("""
-                INSERT OR IGNORE INTO habits (id, name, category, window_start_hour, window_end_hour, notes)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, h)
+        await db.executemany("""
+            INSERT OR IGNORE INTO habits (id, name, category, window_start_hour, window_end_hour, notes)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, default_habits)
 
         await db.commit()
-        print(f"Database initialized at {DB_PATH}")
+        console_logger.info(f"Database initialized at {DB_PATH}")
 
 
-async def log_event(event_type: str, instance_id: str = None, device_id: str = None, details: dict = None):
-    """Log an event to the events table."""
-    async with aiosqlite.connect(DB_PATH) as db:
+def dumps_json(obj) -> str:
+    """Serialize a dict for a TEXT column (orjson; tolerates non-str keys like json.dumps)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# path -> ((mtime_ns, size), parsed) for read_json_file_cached
+_JSON_FILE_CACHE: dict[Path, tuple[tuple, object]] = {}
+
+
+def read_json_file_cached(path: Path):
+    """Parse a JSON state file, re-reading only when its (mtime_ns, size) changes.
+
+    Reads raw bytes and strips a UTF-8 BOM (Windows-written files) before
+    handing them to orjson. Raises OSError/JSONDecodeError like a plain read.
+    """
+    st = path.stat()
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _JSON_FILE_CACHE.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    parsed = orjson.loads(path.read_bytes().removeprefix(b"\xef\xbb\xbf"))
+    _JSON_FILE_CACHE[path] = (signature, parsed)
+    return parsed
+
+
+# Event log writes are queued and inserted in batches by event_writer();
+# EVENT_QUEUE is created in the lifespan (None means write directly).
+EVENT_QUEUE: Optional[asyncio.Queue] = None
+EVENT_FLUSH_INTERVAL = 0.05  # seconds to gather a batch after the first event
+EVENT_BATCH_MAX = 100
+
+
+async def write_events(rows: list):
+    """Insert a batch of event rows as one multi-row INSERT in one transaction.
+
+    Batches are capped at EVENT_BATCH_MAX rows, well under SQLite's bound
+    parameter limit.
+    """
+    values = ", ".join(["(?, ?, ?, ?)"] * len(rows))
+    params = [value for row in rows for value in row]
+    async with db_connection() as db:
+        # When the event writer isn't running, log_event calls this directly,
+        # possibly nested in the same task's db_connection() block with a
+        # transaction already open
+        if not db.in_transaction:
+            await db.execute("BEGIN IMMEDIATE")
         await db.execute(
-            """INSERT INTO events (event_type, instance_id, device_id, details)
-               VALUES (?, ?, ?, ?)""",
-            (event_type, instance_id, device_id, json.dumps(details) if details else None)
+            f"INSERT INTO events (event_type, instance_id, device_id, details) VALUES {values}",
+            params
         )
         await db.commit()
 
 
+async def log_event(event_type: str, instance_id: str = None, device_id: str = None, details: dict = None):
+    """Log an event to the events table (queued when the event writer is running)."""
+    row = (event_type, instance_id, device_id, dumps_json(details) if details else None)
+    if EVENT_QUEUE is None:
+        await write_events([row])
+    else:
+        EVENT_QUEUE.put_nowait(row)
+
+
+def enqueue_event(event_type: str, instance_id: str = None, device_id: str = None, details: dict = None):
+    """Fire-and-forget log_event for sync code paths (no Task per event)."""
+    if EVENT_QUEUE is None:
+        asyncio.ensure_future(log_event(event_type, instance_id, device_id, details))
+    else:
+        EVENT_QUEUE.put_nowait((event_type, instance_id, device_id, dumps_json(details) if details else None))
+
+
+def drain_event_queue(rows: list):
+    """Move up to EVENT_BATCH_MAX queued events into rows without waiting."""
+    while len(rows) < EVENT_BATCH_MAX:
+        try:
+            rows.append(EVENT_QUEUE.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+
+
+async def event_writer():
+    """Background task: batch queued events into single-transaction inserts.
+
+    A None on the queue is the shutdown signal: everything queued ahead of it
+    is written, then the task returns.
+    """
+    while True:
+        rows = [await EVENT_QUEUE.get()]
+        if rows[0] is not None:
+            await asyncio.sleep(EVENT_FLUSH_INTERVAL)
+            drain_event_queue(rows)
+        stopping = None in rows
+        rows = [r for r in rows if r is not None]
+        if rows:
+            try:
+                await write_events(rows)
+            except Exception as e:
+                logger.error(f"Event writer: failed to insert {len(rows)} events: {e}")
+        if stopping:
+            if EVENT_QUEUE.empty():
+                return
+            EVENT_QUEUE.put_nowait(None)
+
+
 def resolve_device_from_ip(ip: str) -> str:
     """Map Tailscale IPs to known devices."""
     return DEVICE_IPS.get(ip, "unknown")
 
 
 # Devices where we can inspect local PIDs, send signals, etc.
-LOCAL_DEVICES = {"desktop", "Mac-Mini", "TokenPC"}
+LOCAL_DEVICES = frozenset({"desktop", "Mac-Mini", "TokenPC"})
 
 
 def is_local_device(device_id: str) -> bool:
@@ -978,11 +1302,10 @@ def is_local_device(device_id: str) -> bool:
 
 
 def get_next_available_profile(used_wsl_voices: set) -> tuple[dict, bool]:
-    """Assign a profile using random-start linear probe (open addressing).
+    """Assign a random free profile from the foreign-accent pool.
 
-    One random call per slot. If the randomly chosen index is taken, increment
-    and check again (wrapping). Guarantees uniform distribution with no wasted
-    random calls.
+    One set difference and one random call: every free voice is equally
+    likely (a random-start linear probe favours voices just after taken ones).
 
     Args:
         used_wsl_voices: Set of WSL voice names currently held by active instances.
@@ -991,84 +1314,110 @@ def get_next_available_profile(used_wsl_voices: set) -> tuple[dict, bool]:
         (profile_dict, pool_exhausted) — pool_exhausted is True if we had to
         dip into fallback voices (David/Zira/Mark) or the ultimate fallback.
     """
-    # 1. Try foreign-accent pool with linear probe
-    n = len(PROFILES)
-    start = random.randint(0, n - 1)
-    for i in range(n):
-        idx = (start + i) % n
-        if PROFILES[idx]["wsl_voice"] not in used_wsl_voices:
-            return PROFILES[idx], False
+    # 1. Try foreign-accent pool
+    available = PROFILE_VOICE_SET.difference(used_wsl_voices)
+    if available:
+        return PROFILE_BY_VOICE[random.choice(tuple(available))], False
 
     # 2. Foreign pool exhausted — try fallback voices (David, Zira, Mark)
-    for fb in FALLBACK_VOICES:
-        if fb["wsl_voice"] not in used_wsl_voices:
-            return fb, True
-
     # 3. Everything exhausted — ultimate fallback (David, will duplicate)
-    return ULTIMATE_FALLBACK, True
+    fallback = next((fb for fb in FALLBACK_VOICES if fb["wsl_voice"] not in used_wsl_voices), ULTIMATE_FALLBACK)
+    return fallback, True
 
 
 # ============ Scheduled Task System ============
 
+_INTERVAL_RE = re.compile(r'^(\d+)(s|m|h|d)$')
+_INTERVAL_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
 def parse_interval_schedule(schedule: str) -> dict:
     """Parse interval schedule string like '30m', '1h', '5s' into trigger kwargs."""
-    match = re.match(r'^(\d+)(s|m|h|d)$', schedule.strip().lower())
+    match = _INTERVAL_RE.match(schedule.strip().lower())
     if not match:
         raise ValueError(f"Invalid interval format: {schedule}. Use format like '30m', '1h', '5s'")
 
-    value = int(match.group(1))
-    unit = match.group(2)
+    value, unit = match.groups()
+    return {_INTERVAL_UNITS[unit]: int(value)}
+
+
+@functools.lru_cache(maxsize=64)
+def interval_to_timedelta(schedule: str) -> timedelta:
+    """Convert an interval schedule string like '30m' into a timedelta (memoized)."""
+    return timedelta(**parse_interval_schedule(schedule))
 
-    unit_map = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
-    return {unit_map[unit]: value}
+
+def _build_interval_trigger(schedule: str) -> IntervalTrigger:
+    """Build an IntervalTrigger for a schedule like '30m'.
+
+    Only the parse is memoized: an IntervalTrigger anchors its start_date when
+    constructed, so each add_job needs a fresh one.
+    """
+    interval = interval_to_timedelta(schedule)
+    return IntervalTrigger(days=interval.days, seconds=interval.seconds)
+
+
+@functools.lru_cache(maxsize=128)
+def _build_cron_trigger(schedule: str) -> CronTrigger:
+    """Build (and memoize) a CronTrigger for a 5-field cron expression."""
+    # Parse cron expression (minute hour day month day_of_week)
+    parts = schedule.split()
+    if len(parts) != 5:
+        raise ValueError(f"Invalid cron expression: {schedule}")
+    return CronTrigger(
+        minute=parts[0],
+        hour=parts[1],
+        day=parts[2],
+        month=parts[3],
+        day_of_week=parts[4]
+    )
 
 
 async def acquire_task_lock(task_id: str) -> bool:
     """Try to acquire a lock for a task. Returns True if lock acquired."""
-    now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        try:
-            await db.execute(
-                "INSERT INTO task_locks (task_id, locked_at, locked_by) VALUES (?, ?, ?)",
-                (task_id, now, "main")
-            )
-            await db.commit()
-            return True
-        except aiosqlite.IntegrityError:
-            # Lock already exists - check if it's stale (> 1 hour old)
-            cursor = await db.execute(
-                "SELECT locked_at FROM task_locks WHERE task_id = ?",
-                (task_id,)
-            )
-            row = await cursor.fetchone()
-            if row:
-                locked_at = datetime.fromisoformat(row[0])
-                if datetime.now() - locked_at > timedelta(hours=1):
-                    # Stale lock, force acquire
-                    await db.execute(
-                        "UPDATE task_locks SET locked_at = ?, locked_by = ? WHERE task_id = ?",
-                        (now, "main", task_id)
-                    )
-                    await db.commit()
-                    return True
-            return False
+    now_epoch = int(time.time())
+    now = datetime.fromtimestamp(now_epoch).isoformat()
+    async with db_connection() as db:
+        # One upsert: a fresh insert or a takeover of a stale (> 1 hour) lock
+        # returns a row; a live lock leaves the conflict WHERE false and returns
+        # nothing. Locks written before the epoch column existed only have the
+        # ISO string (local time, hence the 'utc' modifier).
+        cursor = await db.execute(
+            """
+            INSERT INTO task_locks (task_id, locked_at, locked_at_epoch, locked_by) VALUES (?, ?, ?, ?)
+            ON CONFLICT(task_id) DO UPDATE SET
+                locked_at = excluded.locked_at,
+                locked_at_epoch = excluded.locked_at_epoch,
+                locked_by = excluded.locked_by
+            WHERE excluded.locked_at_epoch - COALESCE(
+                task_locks.locked_at_epoch,
+                CAST(strftime('%s', task_locks.locked_at, 'utc') AS INTEGER)
+            ) > 3600
+            RETURNING 1
+            """,
+            (task_id, now, now_epoch, "main")
+        )
+        acquired = await cursor.fetchone() is not None
+        await db.commit()
+        return acquired
 
 
 async def release_task_lock(task_id: str):
     """Release a task lock."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute("DELETE FROM task_locks WHERE task_id = ?", (task_id,))
         await db.commit()
 
 
 async def log_task_start(task_id: str) -> int:
     """Log task execution start and return execution_id."""
-    now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    now_epoch = int(time.time())
+    now = datetime.fromtimestamp(now_epoch).isoformat()
+    async with db_connection() as db:
         cursor = await db.execute(
-            """INSERT INTO task_executions (task_id, status, started_at)
-               VALUES (?, 'running', ?)""",
-            (task_id, now)
+            """INSERT INTO task_executions (task_id, status, started_at, started_at_epoch)
+               VALUES (?, 'running', ?, ?)""",
+            (task_id, now, now_epoch)
         )
         await db.commit()
         return cursor.lastrowid
@@ -1077,12 +1426,12 @@ async def log_task_start(task_id: str) -> int:
 async def log_task_complete(execution_id: int, duration_ms: int, result: dict):
     """Log successful task completion."""
     now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute(
             """UPDATE task_executions
                SET status = 'completed', completed_at = ?, duration_ms = ?, result = ?
                WHERE id = ?""",
-            (now, duration_ms, json.dumps(result), execution_id)
+            (now, duration_ms, dumps_json(result), execution_id)
         )
         await db.commit()
 
@@ -1090,12 +1439,12 @@ async def log_task_complete(execution_id: int, duration_ms: int, result: dict):
 async def log_task_failed(execution_id: int, error: str):
     """Log task failure."""
     now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute(
             """UPDATE task_executions
                SET status = 'failed', completed_at = ?, result = ?
                WHERE id = ?""",
-            (now, json.dumps({"error": error}), execution_id)
+            (now, dumps_json({"error": error}), execution_id)
         )
         await db.commit()
 
@@ -1105,7 +1454,7 @@ async def log_task_failed(execution_id: int, error: str):
 async def cleanup_stale_instances() -> dict:
     """Mark instances with no activity for 3+ hours as stopped."""
     cutoff = (datetime.now() - timedelta(hours=3)).isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("""
             UPDATE claude_instances
             SET status = 'stopped', stopped_at = CURRENT_TIMESTAMP
@@ -1114,6 +1463,7 @@ async def cleanup_stale_instances() -> dict:
         """, (cutoff,))
         affected = cursor.rowcount
         await db.commit()
+        invalidate_active_count()
 
     if affected > 0:
         await log_event("task_cleanup", details={"cleaned_up": affected})
@@ -1124,7 +1474,7 @@ async def cleanup_stale_instances() -> dict:
 async def purge_old_events() -> dict:
     """Delete events older than 30 days."""
     cutoff = (datetime.now() - timedelta(days=30)).isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "DELETE FROM events WHERE created_at < ?",
             (cutoff,)
@@ -1147,33 +1497,41 @@ TASK_REGISTRY = {
 }
 
 
-async def execute_task(task_id: str):
-    """Execute a scheduled task with locking and logging."""
+# Admission control for task runs: bursts of triggers/overdue catch-up queue
+# here instead of all running at once (duplicates are already rejected by the
+# per-task lock before waiting)
+MAX_CONCURRENT_TASKS = 4
+TASK_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+
+
+async def execute_task(task_id: str, task_func):
+    """Execute a scheduled task with locking and logging.
+
+    task_func is the TASK_REGISTRY entry, bound when the job is registered.
+    """
     # Try to acquire lock
     if not await acquire_task_lock(task_id):
-        print(f"Task {task_id} is already running, skipping")
+        console_logger.info(f"Task {task_id} is already running, skipping")
         return
 
-    # Log start
-    execution_id = await log_task_start(task_id)
-
     try:
-        start_time = time.time()
+        async with TASK_SEMAPHORE:
+            # Log start
+            execution_id = await log_task_start(task_id)
 
-        # Execute the task
-        task_func = TASK_REGISTRY.get(task_id)
-        if not task_func:
-            raise ValueError(f"Unknown task: {task_id}")
+            try:
+                start_time = time.time()
 
-        result = await task_func()
+                # Execute the task
+                result = await task_func()
 
-        duration_ms = int((time.time() - start_time) * 1000)
-        await log_task_complete(execution_id, duration_ms, result)
-        print(f"Task {task_id} completed in {duration_ms}ms: {result}")
+                duration_ms = int((time.time() - start_time) * 1000)
+                await log_task_complete(execution_id, duration_ms, result)
+                console_logger.info(f"Task {task_id} completed in {duration_ms}ms: {result}")
 
-    except Exception as e:
-        await log_task_failed(execution_id, str(e))
-        print(f"Task {task_id} failed: {e}")
+            except Exception as e:
+                await log_task_failed(execution_id, str(e))
+                console_logger.error(f"Task {task_id} failed: {e}")
 
     finally:
         await release_task_lock(task_id)
@@ -1181,7 +1539,7 @@ async def execute_task(task_id: str):
 
 async def load_tasks_from_db():
     """Load enabled tasks from database and register with scheduler."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_reader() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT id, task_type, schedule FROM scheduled_tasks WHERE enabled = 1"
@@ -1194,41 +1552,29 @@ async def load_tasks_from_db():
         schedule = task["schedule"]
 
         if task_id not in TASK_REGISTRY:
-            print(f"Warning: Task {task_id} has no implementation, skipping")
+            console_logger.warning(f"Task {task_id} has no implementation, skipping")
             continue
 
         try:
             if task_type == "interval":
-                trigger_kwargs = parse_interval_schedule(schedule)
-                trigger = IntervalTrigger(**trigger_kwargs)
+                trigger = _build_interval_trigger(schedule)
             elif task_type == "cron":
-                # Parse cron expression (minute hour day month day_of_week)
-                parts = schedule.split()
-                if len(parts) == 5:
-                    trigger = CronTrigger(
-                        minute=parts[0],
-                        hour=parts[1],
-                        day=parts[2],
-                        month=parts[3],
-                        day_of_week=parts[4]
-                    )
-                else:
-                    raise ValueError(f"Invalid cron expression: {schedule}")
+                trigger = _build_cron_trigger(schedule)
             else:
-                print(f"Unknown task type: {task_type}")
+                console_logger.warning(f"Unknown task type: {task_type}")
                 continue
 
             scheduler.add_job(
                 execute_task,
                 trigger=trigger,
-                args=[task_id],
+                args=[task_id, TASK_REGISTRY[task_id]],
                 id=task_id,
                 replace_existing=True
             )
-            print(f"Registered task: {task_id} ({task_type}: {schedule})")
+            console_logger.info(f"Registered task: {task_id} ({task_type}: {schedule})")
 
         except Exception as e:
-            print(f"Failed to register task {task_id}: {e}")
+            console_logger.error(f"Failed to register task {task_id}: {e}")
 
 
 async def restore_desktop_state():
@@ -1242,7 +1588,7 @@ async def restore_desktop_state():
     Timer state is restored separately via timer_load_from_db() before this.
     """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with db_reader() as db:
             # Restore current_mode from the last desktop_mode_change event
             cursor = await db.execute(
                 "SELECT details FROM events WHERE event_type = 'desktop_mode_change' ORDER BY id DESC LIMIT 1"
@@ -1255,16 +1601,16 @@ async def restore_desktop_state():
                     DESKTOP_STATE["current_mode"] = restored_mode
                     DESKTOP_STATE["in_meeting"] = (restored_mode == "meeting")
                     DESKTOP_STATE["last_detection"] = datetime.now().isoformat()
-                    print(f"Restored desktop mode: {restored_mode} (from last event)")
+                    console_logger.info(f"Restored desktop mode: {restored_mode} (from last event)")
                     return
-        print("No previous desktop mode found, defaulting to silence")
+        console_logger.info("No previous desktop mode found, defaulting to silence")
     except Exception as e:
-        print(f"Failed to restore desktop state: {e}")
+        console_logger.error(f"Failed to restore desktop state: {e}")
 
 
 async def run_overdue_tasks():
     """Check for tasks that haven't run recently and execute them on startup."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
 
         # Get all enabled tasks
@@ -1273,6 +1619,17 @@ async def run_overdue_tasks():
         )
         tasks = await cursor.fetchall()
 
+        # Last execution time for every task in one grouped query
+        # (epoch column first; ISO string only for rows that predate it)
+        cursor = await db.execute(
+            "SELECT task_id, MAX(started_at_epoch), MAX(started_at) FROM task_executions GROUP BY task_id"
+        )
+        last_runs = {
+            row[0]: row[1] if row[1] is not None else datetime.fromisoformat(row[2]).timestamp()
+            for row in await cursor.fetchall()
+        }
+        now_epoch = time.time()
+
         for task in tasks:
             task_id = task["id"]
             task_type = task["task_type"]
@@ -1284,60 +1641,44 @@ async def run_overdue_tasks():
             # Determine the expected run interval for this task
             if task_type == "interval":
                 try:
-                    trigger_kwargs = parse_interval_schedule(schedule)
-                    # Convert to timedelta
-                    if "seconds" in trigger_kwargs:
-                        expected_interval = timedelta(seconds=trigger_kwargs["seconds"])
-                    elif "minutes" in trigger_kwargs:
-                        expected_interval = timedelta(minutes=trigger_kwargs["minutes"])
-                    elif "hours" in trigger_kwargs:
-                        expected_interval = timedelta(hours=trigger_kwargs["hours"])
-                    elif "days" in trigger_kwargs:
-                        expected_interval = timedelta(days=trigger_kwargs["days"])
-                    else:
-                        expected_interval = timedelta(hours=24)
-                except:
+                    expected_interval = interval_to_timedelta(schedule)
+                except (ValueError, TypeError, AttributeError):
+                    # Malformed, NULL or non-string schedule: fall back to daily
                     expected_interval = timedelta(hours=24)
             else:
                 # For cron tasks, assume they should run at least once per day
                 expected_interval = timedelta(hours=24)
 
             # Check last execution time
-            cursor = await db.execute(
-                """SELECT MAX(started_at) as last_run
-                   FROM task_executions WHERE task_id = ?""",
-                (task_id,)
-            )
-            row = await cursor.fetchone()
+            last_run_epoch = last_runs.get(task_id)
 
             should_run = False
             reason = ""
 
-            if row["last_run"] is None:
+            if last_run_epoch is None:
                 # Never run before
                 should_run = True
                 reason = "never run before"
             else:
-                last_run = datetime.fromisoformat(row["last_run"])
-                time_since_last = datetime.now() - last_run
+                seconds_since_last = now_epoch - last_run_epoch
 
                 # Run if it's been more than 2x the expected interval
                 # (gives some buffer for normal scheduling variance)
-                if time_since_last > (expected_interval * 2):
+                if seconds_since_last > expected_interval.total_seconds() * 2:
                     should_run = True
-                    hours_overdue = time_since_last.total_seconds() / 3600
+                    hours_overdue = seconds_since_last / 3600
                     reason = f"overdue by {hours_overdue:.1f} hours"
 
             if should_run:
-                print(f"Startup check: Running {task_id} ({reason})")
+                console_logger.info(f"Startup check: Running {task_id} ({reason})")
                 # Run asynchronously so we don't block startup
-                asyncio.create_task(execute_task(task_id))
+                asyncio.create_task(execute_task(task_id, TASK_REGISTRY[task_id]))
 
 
 # Lifespan context manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global tts_worker_task, stale_flag_cleaner_task, timer_worker_task
+    global tts_worker_task, stale_flag_cleaner_task, timer_worker_task, event_writer_task, EVENT_QUEUE, webhook_http
 
     # Install asyncio exception handler for this loop
     loop = asyncio.get_running_loop()
@@ -1345,7 +1686,7 @@ async def lifespan(app: FastAPI):
 
     # Log startup to crash log for context
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _fast_ts()
         with open(CRASH_LOG_PATH, "a") as f:
             f.write(f"\n--- SERVER STARTED at {timestamp} ---\n")
     except Exception:
@@ -1355,54 +1696,64 @@ async def lifespan(app: FastAPI):
     _restore_twitter_zap_cooldown()
 
     # Startup
+    await open_shared_db()
     await init_db()
-    await load_tasks_from_db()
+    EVENT_QUEUE = asyncio.Queue()
+    event_writer_task = asyncio.create_task(event_writer())
+    webhook_http = httpx.AsyncClient(
+        timeout=WEBHOOK_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=20),
+    )
     timer_load_from_db()
-    await restore_desktop_state()
+    # Task registration and desktop-state restore are independent reads on
+    # separate reader-pool connections, so they genuinely overlap
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(load_tasks_from_db())
+        tg.create_task(restore_desktop_state())
     # Sync timer activity layer with restored desktop mode
     desktop_mode = DESKTOP_STATE.get("current_mode", "silence")
     now_ms = int(time.monotonic() * 1000)
     if desktop_mode in ("video", "scrolling", "gaming"):
         is_sg = desktop_mode in ("scrolling", "gaming")
         timer_engine.set_activity(Activity.DISTRACTION, is_scrolling_gaming=is_sg, now_mono_ms=now_ms)
-        print(f"TIMER: Synced activity=DISTRACTION (desktop={desktop_mode}, scrolling_gaming={is_sg})")
+        console_logger.info(f"TIMER: Synced activity=DISTRACTION (desktop={desktop_mode}, scrolling_gaming={is_sg})")
     else:
         timer_engine.set_activity(Activity.WORKING, is_scrolling_gaming=False, now_mono_ms=now_ms)
-        print(f"TIMER: Synced activity=WORKING (desktop={desktop_mode})")
+        console_logger.info(f"TIMER: Synced activity=WORKING (desktop={desktop_mode})")
     # Stash cleanup on startup + hourly
     stash_cleanup()
     scheduler.add_job(stash_cleanup, IntervalTrigger(hours=1), id="stash_cleanup", replace_existing=True)
     # 7 AM daily timer reset (clear accumulated break + wipe prior-day timer events)
     scheduler.add_job(timer_9am_reset, CronTrigger(hour=7, minute=0), id="timer_7am_reset", replace_existing=True)
     scheduler.start()
-    print("Scheduler started")
+    console_logger.info("Scheduler started")
     # Initialize cron engine
     global cron_engine
     cron_engine = CronEngine(scheduler, DB_PATH)
     await cron_engine.recover_orphaned_runs()
     await cron_engine.ensure_permanent_jobs()
-    print("Cron engine loaded")
+    console_logger.info("Cron engine loaded")
     # Start TTS queue worker
     tts_worker_task = asyncio.create_task(tts_queue_worker())
-    print("TTS queue worker started")
+    console_logger.info("TTS queue worker started")
     # Start stale flag cleaner
     stale_flag_cleaner_task = asyncio.create_task(clear_stale_processing_flags())
-    print("Stale flag cleaner started")
+    console_logger.info("Stale flag cleaner started")
     # Start stuck instance detector
     stuck_detector_task = asyncio.create_task(detect_stuck_instances())
-    print("Stuck instance detector started")
+    console_logger.info("Stuck instance detector started")
     # Start timer engine worker
     timer_worker_task = asyncio.create_task(timer_worker())
-    print("Timer engine started")
+    console_logger.info("Timer engine started")
     # Start phone heartbeat monitor
     asyncio.create_task(phone_heartbeat_worker())
-    print("Phone heartbeat monitor started")
+    console_logger.info("Phone heartbeat monitor started")
     await run_overdue_tasks()
     yield
 
     # Log shutdown to crash log
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _fast_ts()
         with open(CRASH_LOG_PATH, "a") as f:
             f.write(f"--- SERVER STOPPING at {timestamp} ---\n")
     except Exception:
@@ -1428,7 +1779,15 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
     scheduler.shutdown(wait=True)
-    print("Scheduler stopped")
+    console_logger.info("Scheduler stopped")
+    if event_writer_task:
+        EVENT_QUEUE.put_nowait(None)
+        await event_writer_task
+        EVENT_QUEUE = None
+    if webhook_http:
+        client, webhook_http = webhook_http, None
+        await client.aclose()
+    await close_shared_db()
 
 
 # FastAPI App
@@ -1463,15 +1822,18 @@ async def register_instance(request: InstanceRegisterRequest):
     if not device_id:
         device_id = "Mac-Mini"  # Default for local sessions on Mac Mini
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
+        # Take the write lock up front so a concurrent registration can't grab
+        # the same voice between our SELECT and INSERT
+        await db.execute("BEGIN IMMEDIATE")
+
         # Get WSL voices held by active instances only (stopped instances release their voice)
         cursor = await db.execute(
-            "SELECT tts_voice FROM claude_instances WHERE status IN ('processing', 'idle')"
+            "SELECT tts_voice FROM claude_instances WHERE status IN ('processing', 'idle') AND tts_voice IS NOT NULL"
         )
-        rows = await cursor.fetchall()
-        used_wsl_voices = {row[0] for row in rows if row[0]}
+        used_wsl_voices = {row[0] for row in await cursor.fetchall()}
 
-        # Assign profile via linear probe
+        # Assign profile from the free pool
         profile, pool_exhausted = get_next_available_profile(used_wsl_voices)
 
         # Insert instance
@@ -1498,26 +1860,29 @@ async def register_instance(request: InstanceRegisterRequest):
                 now
             )
         )
-        await db.commit()
 
-    if pool_exhausted:
-        logger.warning(f"Voice pool exhausted — assigned fallback voice {profile['wsl_voice']}")
-
-    # Log event
-    await log_event(
-        "instance_registered",
-        instance_id=request.instance_id,
-        device_id=device_id,
-        details={"tab_name": request.tab_name, "origin_type": request.origin_type}
-    )
+        # Log event in the same transaction (one commit for the whole registration)
+        await db.execute(
+            """INSERT INTO events (event_type, instance_id, device_id, details)
+               VALUES (?, ?, ?, ?)""",
+            ("instance_registered", request.instance_id, device_id,
+             dumps_json({"tab_name": request.tab_name, "origin_type": request.origin_type}))
+        )
 
-    # Push updated instance count to phone widget
-    async with aiosqlite.connect(DB_PATH) as db:
+        # Updated instance count for the phone widget
         cursor = await db.execute(
             "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle') AND COALESCE(is_subagent, 0) = 0"
         )
         row = await cursor.fetchone()
         active_count = row[0] if row else 0
+        await db.commit()
+        invalidate_active_count()
+        invalidate_instance_profile(request.instance_id)
+
+    if pool_exhausted:
+        logger.warning(f"Voice pool exhausted — assigned fallback voice {profile['wsl_voice']}")
+
+    # Push updated instance count to phone widget
     asyncio.create_task(push_phone_widget_async(timer_engine.current_mode.value, active_count))
 
     return ProfileResponse(
@@ -1536,7 +1901,7 @@ async def delete_all_instances():
     """Delete all instances from the database (clear all)."""
     now = datetime.now().isoformat()
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Get all instances before deleting
         cursor = await db.execute(
             "SELECT id, device_id, status FROM claude_instances"
@@ -1552,6 +1917,8 @@ async def delete_all_instances():
         # Delete all instances from the database
         await db.execute("DELETE FROM claude_instances")
         await db.commit()
+        invalidate_active_count()
+        invalidate_instance_profile()
 
     # Log bulk deletion event
     await log_event(
@@ -1561,7 +1928,7 @@ async def delete_all_instances():
 
     # Check enforcement if there were active instances
     if active_count > 0 and DESKTOP_STATE.get("current_mode") == "video":
-        enforce_result = close_distraction_windows()
+        enforce_result = await close_distraction_windows()
         await log_event(
             "enforcement_triggered",
             details={"trigger": "all_instances_deleted", "result": enforce_result}
@@ -1582,52 +1949,41 @@ async def stop_instance(instance_id: str):
     logger.info(f"Stopping instance: {instance_id[:12]}...")
     now = datetime.now().isoformat()
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT id, device_id, COALESCE(is_subagent, 0) FROM claude_instances WHERE id = ?",
-            (instance_id,)
-        )
-        row = await cursor.fetchone()
-
-        if not row:
-            raise HTTPException(status_code=404, detail="Instance not found")
-
-        is_subagent = row[2]
+    async with db_connection() as db:
+        await db.execute("BEGIN IMMEDIATE")
 
-        # Count non-subagent active instances BEFORE stopping
+        # Active counts (all / non-subagent) BEFORE stopping, plus whether this
+        # instance is one of them — a single scan instead of three COUNT queries
         cursor = await db.execute(
-            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle') AND COALESCE(is_subagent, 0) = 0"
+            """SELECT (SELECT status IN ('processing', 'idle') FROM claude_instances WHERE id = ?),
+                      COUNT(*),
+                      COALESCE(SUM(COALESCE(is_subagent, 0) = 0), 0)
+               FROM claude_instances WHERE status IN ('processing', 'idle')""",
+            (instance_id,)
         )
-        count_row = await cursor.fetchone()
-        was_active = count_row[0] if count_row else 0
+        was_live, was_active_all, was_active = await cursor.fetchone()
 
-        await db.execute(
+        rows = await db.execute_fetchall(
             """UPDATE claude_instances
                SET status = 'stopped', stopped_at = ?
-               WHERE id = ?""",
+               WHERE id = ?
+               RETURNING device_id, COALESCE(is_subagent, 0)""",
             (now, instance_id)
         )
+        if not rows:
+            raise HTTPException(status_code=404, detail="Instance not found")
         await db.commit()
+        invalidate_active_count()
 
-        # Check remaining active instances (all)
-        cursor = await db.execute(
-            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle')"
-        )
-        count_row = await cursor.fetchone()
-        remaining_active = count_row[0] if count_row else 0
-
-        # Count remaining non-subagent active instances
-        cursor = await db.execute(
-            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle') AND COALESCE(is_subagent, 0) = 0"
-        )
-        count_row = await cursor.fetchone()
-        remaining_non_sub = count_row[0] if count_row else 0
+    device_id, is_subagent = rows[0]
+    remaining_active = was_active_all - (1 if was_live else 0)
+    remaining_non_sub = was_active - (1 if was_live and not is_subagent else 0)
 
     # Log event
     await log_event(
         "instance_stopped",
         instance_id=instance_id,
-        device_id=row[1]
+        device_id=device_id
     )
 
     # Instance count Pavlok signals (skip subagents)
@@ -1641,7 +1997,7 @@ async def stop_instance(instance_id: str):
     # If no more active instances and video mode was active, enforce
     if remaining_active == 0 and DESKTOP_STATE.get("current_mode") == "video":
         print(f"ENFORCE: Last instance stopped while in video mode, closing distractions")
-        enforce_result = close_distraction_windows()
+        enforce_result = await close_distraction_windows()
         await log_event(
             "enforcement_triggered",
             details={
@@ -1659,36 +2015,43 @@ async def stop_instance(instance_id: str):
     return {"status": "stopped", "instance_id": instance_id}
 
 
-async def find_claude_pid_by_workdir(working_dir: str) -> Optional[int]:
-    """Scan /proc for claude processes matching the working directory.
+def _scan_claude_pids_by_workdir(working_dir: str) -> Optional[list]:
+    """Single /proc pass: PIDs whose cwd is working_dir and comm is claude.
 
-    Returns the PID if exactly one match is found, None otherwise.
+    The cwd readlink is one syscall and rarely matches, so it filters first;
+    /proc/<pid>/comm is only opened for the few processes that survive it.
     """
-    if not working_dir:
-        return None
-
+    target = working_dir.rstrip("/")
     matches = []
     try:
-        for entry in os.listdir("/proc"):
-            if not entry.isdigit():
+        entries = os.scandir("/proc")
+    except OSError:
+        return None
+    with entries:
+        for entry in entries:
+            if not entry.name.isdigit():
                 continue
-            pid = int(entry)
             try:
-                comm_path = f"/proc/{pid}/comm"
-                with open(comm_path, "r") as f:
-                    comm = f.read().strip()
-                if comm != "claude":
+                if os.readlink(f"{entry.path}/cwd").rstrip("/") != target:
                     continue
-                cwd_path = f"/proc/{pid}/cwd"
-                cwd = os.readlink(cwd_path)
-                if cwd.rstrip("/") == working_dir.rstrip("/"):
-                    matches.append(pid)
-            except (OSError, PermissionError):
+            except OSError:
                 continue
-    except OSError:
+            pid = int(entry.name)
+            if is_pid_claude(pid):
+                matches.append(pid)
+    return matches
+
+
+async def find_claude_pid_by_workdir(working_dir: str) -> Optional[int]:
+    """Scan /proc for claude processes matching the working directory.
+
+    Returns the PID if exactly one match is found, None otherwise.
+    """
+    if not working_dir:
         return None
 
-    if len(matches) == 1:
+    matches = await asyncio.to_thread(_scan_claude_pids_by_workdir, working_dir)
+    if matches and len(matches) == 1:
         return matches[0]
     return None
 
@@ -1730,7 +2093,7 @@ async def kill_instance(instance_id: str):
     now = datetime.now().isoformat()
 
     # Look up instance
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM claude_instances WHERE id = ?",
@@ -1755,12 +2118,13 @@ async def kill_instance(instance_id: str):
                 logger.info(f"Kill: discovered PID {pid} via /proc scan for {working_dir}")
             else:
                 # Mark stopped in DB anyway (cleanup)
-                async with aiosqlite.connect(DB_PATH) as db:
+                async with db_connection() as db:
                     await db.execute(
                         "UPDATE claude_instances SET status = 'stopped', stopped_at = ? WHERE id = ?",
                         (now, instance_id)
                     )
                     await db.commit()
+                    invalidate_active_count()
                 await log_event("instance_killed", instance_id=instance_id, device_id=device_id,
                                 details={"error": "no_pid", "status": "marked_stopped"})
                 raise HTTPException(
@@ -1769,12 +2133,13 @@ async def kill_instance(instance_id: str):
                 )
         else:
             # Can't scan /proc on remote device
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with db_connection() as db:
                 await db.execute(
                     "UPDATE claude_instances SET status = 'stopped', stopped_at = ? WHERE id = ?",
                     (now, instance_id)
                 )
                 await db.commit()
+                invalidate_active_count()
             await log_event("instance_killed", instance_id=instance_id, device_id=device_id,
                             details={"error": "no_pid_remote", "status": "marked_stopped"})
             raise HTTPException(
@@ -1787,12 +2152,13 @@ async def kill_instance(instance_id: str):
         # Validate PID still belongs to claude
         if not is_pid_claude(pid):
             # Process already exited or PID reused by another process
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with db_connection() as db:
                 await db.execute(
                     "UPDATE claude_instances SET status = 'stopped', stopped_at = ? WHERE id = ?",
                     (now, instance_id)
                 )
                 await db.commit()
+                invalidate_active_count()
             await log_event("instance_killed", instance_id=instance_id, device_id=device_id,
                             details={"pid": pid, "status": "already_dead"})
             return {"status": "already_dead", "pid": pid, "signal": None}
@@ -1804,12 +2170,13 @@ async def kill_instance(instance_id: str):
             logger.info(f"Kill: sent first SIGINT to PID {pid}")
         except ProcessLookupError:
             # Already dead
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with db_connection() as db:
                 await db.execute(
                     "UPDATE claude_instances SET status = 'stopped', stopped_at = ? WHERE id = ?",
                     (now, instance_id)
                 )
                 await db.commit()
+                invalidate_active_count()
             await log_event("instance_killed", instance_id=instance_id, device_id=device_id,
                             details={"pid": pid, "status": "already_dead"})
             return {"status": "already_dead", "pid": pid, "signal": None}
@@ -1886,12 +2253,13 @@ async def kill_instance(instance_id: str):
             raise HTTPException(status_code=500, detail=f"SSH kill failed: {str(e)}")
 
     # Mark stopped in DB
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute(
             "UPDATE claude_instances SET status = 'stopped', stopped_at = ? WHERE id = ?",
             (now, instance_id)
         )
         await db.commit()
+        invalidate_active_count()
 
     # Log event
     await log_event(
@@ -1919,7 +2287,7 @@ async def unstick_instance(instance_id: str, level: int = 1):
     logger.info(f"Unstick request for instance: {instance_id[:12]}...")
 
     # Look up instance
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM claude_instances WHERE id = ?",
@@ -1976,7 +2344,7 @@ async def unstick_instance(instance_id: str, level: int = 1):
                 pid = new_pid
                 logger.info(f"Unstick: rediscovered PID {pid} for {working_dir}")
                 # Update the stored PID
-                async with aiosqlite.connect(DB_PATH) as db:
+                async with db_connection() as db:
                     await db.execute("UPDATE claude_instances SET pid = ? WHERE id = ?", (pid, instance_id))
                     await db.commit()
             else:
@@ -2010,7 +2378,7 @@ async def unstick_instance(instance_id: str, level: int = 1):
     # Wait and check for activity change
     await asyncio.sleep(4)
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT last_activity FROM claude_instances WHERE id = ?",
@@ -2182,7 +2550,7 @@ async def diagnose_instance(instance_id: str):
     what syscall it's waiting on, child processes, file descriptors, etc.
     """
     # Look up instance
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM claude_instances WHERE id = ?",
@@ -2265,18 +2633,18 @@ async def diagnose_instance(instance_id: str):
     return result
 
 
-class RenameInstanceRequest(BaseModel):
+class RenameInstanceRequest(FastModel):
     tab_name: str
 
 
-class LogEntry(BaseModel):
+class LogEntry(FastModel):
     """Single log entry."""
     timestamp: str
     level: str
     message: str
 
 
-class LogsResponse(BaseModel):
+class LogsResponse(FastModel):
     """Response for recent logs."""
     logs: List[LogEntry]
     count: int
@@ -2285,7 +2653,7 @@ class LogsResponse(BaseModel):
 @app.patch("/api/instances/{instance_id}/rename")
 async def rename_instance(instance_id: str, request: RenameInstanceRequest):
     """Rename an instance's tab_name."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "SELECT id, tab_name FROM claude_instances WHERE id = ?",
             (instance_id,)
@@ -2301,6 +2669,7 @@ async def rename_instance(instance_id: str, request: RenameInstanceRequest):
             (request.tab_name, instance_id)
         )
         await db.commit()
+    invalidate_instance_profile(instance_id)
 
     # Log event
     await log_event(
@@ -2312,7 +2681,7 @@ async def rename_instance(instance_id: str, request: RenameInstanceRequest):
     return {"status": "renamed", "instance_id": instance_id, "tab_name": request.tab_name}
 
 
-class VoiceChangeRequest(BaseModel):
+class VoiceChangeRequest(FastModel):
     voice: str
 
 
@@ -2336,20 +2705,14 @@ async def list_voices():
 
 
 def find_voice_linear_probe(used_voices: set) -> str | None:
-    """Find an available WSL voice using random offset + linear probe.
+    """Find an available WSL voice, uniformly at random among free ones.
 
-    Picks a random starting index in PROFILES (foreign accents), then iterates
-    circularly until finding a voice not in used_voices. Falls back to
-    FALLBACK_VOICES, then returns None if everything is taken.
+    Picks from the PROFILES (foreign accents) voices not in used_voices. Falls
+    back to FALLBACK_VOICES, then returns None if everything is taken.
     """
-    n = len(PROFILES)
-    if n > 0:
-        start = random.randint(0, n - 1)
-        for i in range(n):
-            idx = (start + i) % n
-            voice = PROFILES[idx]["wsl_voice"]
-            if voice not in used_voices:
-                return voice
+    available = PROFILE_VOICE_SET.difference(used_voices)
+    if available:
+        return random.choice(tuple(available))
 
     # Try fallback voices
     for fb in FALLBACK_VOICES:
@@ -2364,17 +2727,16 @@ async def change_instance_voice(instance_id: str, request: VoiceChangeRequest):
     """Change an instance's TTS voice with collision handling.
 
     If the target voice is already in use by another instance, that instance
-    gets bumped using random offset + linear probe to find an open slot.
+    gets bumped to a random open slot.
     No cascade - bumped instance just finds the next available voice.
     """
-    all_voices = {p["wsl_voice"] for p in PROFILES + FALLBACK_VOICES}
-    if request.voice not in all_voices:
+    if request.voice not in ALL_WSL_VOICES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid voice. Available: {', '.join(sorted(all_voices))}"
+            detail=f"Invalid voice. Available: {', '.join(sorted(ALL_WSL_VOICES))}"
         )
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Get all instances and their voices
         cursor = await db.execute("SELECT id, tts_voice, tab_name FROM claude_instances")
         rows = await cursor.fetchall()
@@ -2405,7 +2767,7 @@ async def change_instance_voice(instance_id: str, request: VoiceChangeRequest):
             used_after.discard(original_voice)  # We're freeing this
             used_after.add(request.voice)  # We're taking this
 
-            # Find new voice for bumped instance via linear probe
+            # Find new voice for bumped instance from the free pool
             new_voice_for_holder = find_voice_linear_probe(used_after)
             if not new_voice_for_holder:
                 # All voices in use, give them the voice we just freed
@@ -2420,6 +2782,8 @@ async def change_instance_voice(instance_id: str, request: VoiceChangeRequest):
                 (new_voice, iid)
             )
         await db.commit()
+        for iid, _, _ in changes:
+            invalidate_instance_profile(iid)
 
     # Log events for each change
     for iid, old_v, new_v in changes:
@@ -2452,7 +2816,7 @@ async def set_instance_tts_mode(instance_id: str, request: Request):
     if mode not in ("verbose", "muted", "silent", "voice-chat"):
         raise HTTPException(status_code=400, detail=f"Invalid mode: {mode}. Must be verbose, muted, silent, or voice-chat")
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("SELECT id, tts_voice, notification_sound, tts_mode FROM claude_instances WHERE id = ?", (instance_id,))
         row = await cursor.fetchone()
@@ -2487,6 +2851,7 @@ async def set_instance_tts_mode(instance_id: str, request: Request):
                 (mode, instance_id)
             )
         await db.commit()
+    invalidate_instance_profile(instance_id)
 
     # Manage voice chat session based on mode transition
     if mode == "voice-chat":
@@ -2516,21 +2881,17 @@ async def update_instance_activity(instance_id: str, request: ActivityRequest):
     else:
         raise HTTPException(status_code=400, detail=f"Unknown action: {request.action}")
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
-            "SELECT id FROM claude_instances WHERE id = ?",
-            (instance_id,)
-        )
-        row = await cursor.fetchone()
-
-        if not row:
-            raise HTTPException(status_code=404, detail="Instance not found")
-
-        await db.execute(
             "UPDATE claude_instances SET status = ?, last_activity = ? WHERE id = ?",
             (new_status, now, instance_id)
         )
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Instance not found")
         await db.commit()
+        invalidate_active_count()
+    if new_status == "processing":
+        mark_processing(instance_id)
 
     return {
         "status": "updated",
@@ -2540,20 +2901,39 @@ async def update_instance_activity(instance_id: str, request: ActivityRequest):
     }
 
 
+# instance_id -> (task-file signature, response) for get_instance_todos; LRU
+# so instances that stop without their task dir being removed age out
+TODO_CACHE_MAX = 64
+_TODO_CACHE: OrderedDict[str, tuple[tuple, dict]] = OrderedDict()
+
+
 @app.get("/api/instances/{instance_id}/todos")
 async def get_instance_todos(instance_id: str):
-    """Get the task list for an instance from ~/.claude/tasks/{instance_id}/."""
+    """Get the task list for an instance from ~/.claude/tasks/{instance_id}/.
+
+    Parsed results are cached per instance and reused until a task file is
+    added, removed, or rewritten (checked via name/mtime/size).
+    """
     tasks_dir = Path.home() / ".claude" / "tasks" / instance_id
 
     if not tasks_dir.exists():
+        _TODO_CACHE.pop(instance_id, None)
         return {"todos": [], "progress": 0, "current_task": None, "total": 0, "completed": 0}
 
     try:
-        todos = []
-        for task_file in tasks_dir.glob("*.json"):
-            with open(task_file) as f:
-                task = json.load(f)
-                todos.append(task)
+        task_files = []
+        for entry in os.scandir(tasks_dir):
+            if entry.name.endswith(".json"):
+                st = entry.stat()
+                task_files.append((entry.name, st.st_mtime_ns, st.st_size))
+        signature = tuple(sorted(task_files))
+
+        cached = _TODO_CACHE.get(instance_id)
+        if cached is not None and cached[0] == signature:
+            _TODO_CACHE.move_to_end(instance_id)
+            return cached[1]
+
+        todos = [orjson.loads((tasks_dir / name).read_bytes()) for name, _, _ in signature]
 
         if not todos:
             return {"todos": [], "progress": 0, "current_task": None, "total": 0, "completed": 0}
@@ -2561,23 +2941,30 @@ async def get_instance_todos(instance_id: str):
         # Sort by ID (numeric)
         todos.sort(key=lambda t: int(t.get("id", 0)))
 
-        completed = sum(1 for t in todos if t.get("status") == "completed")
-        total = len(todos)
-        progress = int((completed / total) * 100) if total > 0 else 0
-
+        # Single pass: completed count + first in-progress task
+        completed = 0
         current_task = None
         for t in todos:
-            if t.get("status") == "in_progress":
+            status = t.get("status")
+            if status == "completed":
+                completed += 1
+            elif status == "in_progress" and current_task is None:
                 current_task = t.get("activeForm") or t.get("subject")
-                break
+        total = len(todos)
+        progress = int((completed / total) * 100) if total > 0 else 0
 
-        return {
+        response = {
             "todos": todos,
             "progress": progress,
             "completed": completed,
             "total": total,
             "current_task": current_task
         }
+        _TODO_CACHE[instance_id] = (signature, response)
+        _TODO_CACHE.move_to_end(instance_id)
+        if len(_TODO_CACHE) > TODO_CACHE_MAX:
+            _TODO_CACHE.popitem(last=False)
+        return response
     except Exception as e:
         return {"todos": [], "progress": 0, "current_task": None, "total": 0, "completed": 0, "error": str(e)}
 
@@ -2596,12 +2983,13 @@ async def toggle_voice_chat(instance_id: str, active: bool = True):
         logger.info(f"Voice chat ENDED for {instance_id[:12]}")
     # Keep tts_mode column in sync
     new_mode = "voice-chat" if active else "verbose"
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute(
             "UPDATE claude_instances SET tts_mode = ? WHERE id = ?",
             (new_mode, instance_id)
         )
         await db.commit()
+    invalidate_instance_profile(instance_id)
     return {"instance_id": instance_id, "voice_chat": active}
 
 
@@ -2656,7 +3044,7 @@ def _send_pedal_enter():
     host = DESKTOP_CONFIG["host"]
     port = DESKTOP_CONFIG["port"]
     try:
-        resp = requests.post(
+        resp = satellite_http.post(
             f"http://{host}:{port}/ahk/execute",
             json={"script": "pedal-enter.ahk"},
             timeout=DESKTOP_CONFIG["timeout"],
@@ -2677,7 +3065,7 @@ def _schedule_pedal_enter(delay_s: float):
         PEDAL_STATE["enter_queued"] = False
         PEDAL_STATE["bypass_active"] = True
         PEDAL_STATE["bypass_start"] = time.monotonic()
-        _send_pedal_enter()
+        await asyncio.to_thread(_send_pedal_enter)
         logger.info(f"Pedal: Queued Enter sent after {delay_s}s buffer")
 
     PEDAL_STATE["queued_task"] = asyncio.create_task(_delayed_send())
@@ -2716,7 +3104,7 @@ async def pedal_left():
         if (now - PEDAL_STATE["bypass_start"]) < PEDAL_BYPASS_MS:
             PEDAL_STATE["bypass_active"] = False
             PEDAL_STATE["last_tap_time"] = 0
-            _send_pedal_enter()
+            await asyncio.to_thread(_send_pedal_enter)
             return {"action": "sent", "reason": "bypass"}
         else:
             PEDAL_STATE["bypass_active"] = False
@@ -2724,7 +3112,7 @@ async def pedal_left():
     # Double-tap logic
     if (now - PEDAL_STATE["last_tap_time"]) < (PEDAL_DOUBLE_TAP_MS / 1000.0):
         PEDAL_STATE["last_tap_time"] = 0
-        _send_pedal_enter()
+        await asyncio.to_thread(_send_pedal_enter)
         return {"action": "sent", "reason": "double_tap"}
     else:
         PEDAL_STATE["last_tap_time"] = now
@@ -2743,9 +3131,7 @@ async def list_instances(status: Optional[str] = None, sort: Optional[str] = Non
     }
     order_by = order_clauses.get(sort, "registered_at DESC")
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-
+    async with db_reader() as db:
         if status:
             cursor = await db.execute(
                 f"SELECT * FROM claude_instances WHERE status = ? ORDER BY {order_by}",
@@ -2756,10 +3142,13 @@ async def list_instances(status: Optional[str] = None, sort: Optional[str] = Non
                 f"SELECT * FROM claude_instances ORDER BY {order_by}"
             )
 
+        # Plain tuples zipped against the column names once per query are
+        # cheaper than per-row aiosqlite.Row lookups
+        columns = tuple(d[0] for d in cursor.description)
         rows = await cursor.fetchall()
         instances = []
         for row in rows:
-            inst = dict(row)
+            inst = dict(zip(columns, row))
             # voice_chat derived from tts_mode column (DB-authoritative)
             is_vc = (inst.get("tts_mode") == "voice-chat") or (inst["id"] in VOICE_CHAT_SESSIONS)
             if is_vc:
@@ -2772,13 +3161,14 @@ async def list_instances(status: Optional[str] = None, sort: Optional[str] = Non
                         "started_at": datetime.now().isoformat()
                     }
             instances.append(inst)
-        return instances
+    # Rows are already JSON-ready; skip the List[dict] response validation pass
+    return Response(content=orjson.dumps(instances), media_type="application/json")
 
 
 @app.get("/api/instances/{instance_id}", response_model=dict)
 async def get_instance(instance_id: str):
     """Get details of a specific instance."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_reader() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM claude_instances WHERE id = ?",
@@ -2796,42 +3186,48 @@ async def get_instance(instance_id: str):
 @app.get("/api/dashboard", response_model=DashboardResponse)
 async def get_dashboard():
     """Get dashboard data including instances, productivity status, and events."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_reader() as db:
         db.row_factory = aiosqlite.Row
 
-        # Get all instances
+        # Get all instances (active count tallied in the same pass)
         cursor = await db.execute(
             "SELECT * FROM claude_instances ORDER BY status ASC, registered_at DESC"
         )
-        instances = [dict(row) for row in await cursor.fetchall()]
+        instances = []
+        active_count = 0
+        for row in await cursor.fetchall():
+            instance = dict(row)
+            if instance["status"] in ("processing", "idle"):
+                active_count += 1
+            instances.append(instance)
 
         # Check productivity (any active instances = productive)
-        active_count = sum(1 for i in instances if i["status"] in ("processing", "idle"))
         productivity_active = active_count > 0
 
         # Get recent events (last 20)
         cursor = await db.execute(
             "SELECT * FROM events ORDER BY created_at DESC LIMIT 20"
         )
-        events = []
-        for row in await cursor.fetchall():
-            event = dict(row)
-            if event.get("details"):
+        events = [dict(row) for row in await cursor.fetchall()]
+        _loads = orjson.loads
+        for event in events:
+            if event["details"]:
                 try:
-                    event["details"] = json.loads(event["details"])
-                except:
+                    event["details"] = _loads(event["details"])
+                except orjson.JSONDecodeError:
                     pass
-            events.append(event)
 
-        return DashboardResponse(
-            instances=instances,
-            productivity_active=productivity_active,
-            recent_events=events,
-            tts_queue=get_tts_queue_status()
-        )
+    # Same shape as DashboardResponse; the rows are already JSON-ready, so skip
+    # re-validating every instance/event dict on the way out
+    return Response(content=orjson.dumps({
+        "instances": instances,
+        "productivity_active": productivity_active,
+        "recent_events": events,
+        "tts_queue": get_tts_queue_status(),
+    }), media_type="application/json")
 
 
-class LogEventRequest(BaseModel):
+class LogEventRequest(FastModel):
     event_type: str
     instance_id: Optional[str] = None
     details: Optional[dict] = None
@@ -2859,6 +3255,27 @@ DESKTOP_CONFIG = {
     "timeout": 5,
 }
 
+class _ThreadLocalSession(threading.local):
+    """One requests.Session per thread, behind the Session get/post API.
+
+    requests.Session isn't thread-safe, and satellite calls run concurrently
+    on asyncio.to_thread workers; each worker keeps its own pooled connection.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+
+
+# Keep-alive sessions for token-satellite calls: enforcement, TTS and pedal
+# requests reuse pooled TCP connections instead of reconnecting each time.
+satellite_http = _ThreadLocalSession()
+
 # TTS backend routing state (WSL-first with Mac fallback)
 TTS_BACKEND = {
     "current": None,          # "wsl" | "mac" | None — what's currently speaking
@@ -2883,7 +3300,7 @@ def is_satellite_tts_available() -> bool:
     host = DESKTOP_CONFIG["host"]
     port = DESKTOP_CONFIG["port"]
     try:
-        resp = requests.get(f"http://{host}:{port}/health", timeout=2)
+        resp = satellite_http.get(f"http://{host}:{port}/health", timeout=2)
         available = resp.status_code == 200
     except Exception:
         available = False
@@ -2939,6 +3356,20 @@ PEDAL_BYPASS_MS = 10.0             # seconds of single-tap bypass after buffered
 # Valid desktop detection modes (replaces OBSIDIAN_CONFIG["mode_commands"].keys())
 VALID_DETECTION_MODES = ["silence", "music", "video", "scrolling", "gaming", "gym", "work_gym", "meeting"]
 
+# Unchanged-mode detections are the common AHK case; their (frozen) responses
+# never vary, so build them once instead of per request
+UNCHANGED_DETECTION_RESPONSES = {
+    mode: DesktopDetectionResponse(
+        action="none",
+        detected_mode=mode,
+        reason="mode_unchanged",
+        productivity_active=True,
+        active_instance_count=0,
+        timer_updated=False
+    )
+    for mode in VALID_DETECTION_MODES
+}
+
 # ============ Timer Engine ============
 timer_engine = TimerEngine(now_mono_ms=int(time.monotonic() * 1000))
 
@@ -3054,7 +3485,7 @@ CHECKIN_SCHEDULE = {
 }
 
 
-class CheckinSubmit(BaseModel):
+class CheckinSubmit(FastModel):
     type: str  # checkin_type from CHECKIN_SCHEDULE
     energy: Optional[int] = None
     focus: Optional[int] = None
@@ -3109,7 +3540,7 @@ async def trigger_checkin(checkin_type: str) -> dict:
     prompted_at = datetime.now().isoformat()
 
     # Log the prompt in the database
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute("""
             INSERT OR IGNORE INTO checkins (checkin_type, date, prompted_at)
             VALUES (?, ?, ?)
@@ -3251,7 +3682,7 @@ async def get_daily_note():
     return {"date": today, "content": content, "exists": True, "path": str(note_path)}
 
 
-class DailyNoteAppendRequest(BaseModel):
+class DailyNoteAppendRequest(FastModel):
     content: str
     section: str = ""  # optional section header; if provided, used as ## heading
 
@@ -3586,6 +4017,10 @@ PAVLOK_CONFIG = {
 PAVLOK_STATE = {
     "last_stimulus_at": None,
 }
+# send_pavlok_stimulus runs on worker threads; the cooldown check and the
+# last_stimulus_at reservation must happen together or overlapping triggers
+# can both zap
+_pavlok_lock = threading.Lock()
 
 
 def send_pavlok_stimulus(
@@ -3601,15 +4036,19 @@ def send_pavlok_stimulus(
         return {"skipped": True, "reason": "disabled"}
 
     now = datetime.now()
-    if respect_cooldown and PAVLOK_STATE["last_stimulus_at"]:
-        last = datetime.fromisoformat(PAVLOK_STATE["last_stimulus_at"])
-        elapsed = (now - last).total_seconds()
-        if elapsed < PAVLOK_CONFIG["cooldown_seconds"]:
-            return {"skipped": True, "reason": "cooldown", "remaining": round(PAVLOK_CONFIG["cooldown_seconds"] - elapsed)}
+    with _pavlok_lock:
+        previous = PAVLOK_STATE["last_stimulus_at"]
+        if respect_cooldown and previous:
+            elapsed = (now - datetime.fromisoformat(previous)).total_seconds()
+            if elapsed < PAVLOK_CONFIG["cooldown_seconds"]:
+                return {"skipped": True, "reason": "cooldown", "remaining": round(PAVLOK_CONFIG["cooldown_seconds"] - elapsed)}
+        # Reserve the cooldown before the (slow) POST; released below if it fails
+        PAVLOK_STATE["last_stimulus_at"] = now.isoformat()
 
     if value is None:
         value = PAVLOK_CONFIG["default_zap_value"]
 
+    sent = False
     try:
         response = requests.post(
             PAVLOK_CONFIG["api_url"],
@@ -3617,7 +4056,7 @@ def send_pavlok_stimulus(
             json={"stimulus": {"stimulusType": stimulus_type, "stimulusValue": value}},
             timeout=10,
         )
-        PAVLOK_STATE["last_stimulus_at"] = now.isoformat()
+        sent = True
         print(f"PAVLOK: {stimulus_type} value={value} reason={reason} -> {response.status_code}")
         return {
             "success": response.status_code == 200,
@@ -3635,6 +4074,11 @@ def send_pavlok_stimulus(
     except Exception as e:
         print(f"PAVLOK: Error sending {stimulus_type}: {e}")
         return {"success": False, "error": str(e), "reason": reason}
+    finally:
+        if not sent:
+            with _pavlok_lock:
+                if PAVLOK_STATE["last_stimulus_at"] == now.isoformat():
+                    PAVLOK_STATE["last_stimulus_at"] = previous
 
 
 async def check_instance_count_pavlok(remaining_active: int, was_active: int):
@@ -3646,13 +4090,13 @@ async def check_instance_count_pavlok(remaining_active: int, was_active: int):
     """
     if remaining_active == 1 and was_active >= 2:
         print(f"PAVLOK: Instance count dropped to 1 (from {was_active}), double vibe")
-        send_pavlok_stimulus(stimulus_type="vibe", value=50, reason="one_claude_remaining", respect_cooldown=False)
+        await asyncio.to_thread(send_pavlok_stimulus, stimulus_type="vibe", value=50, reason="one_claude_remaining", respect_cooldown=False)
         await asyncio.sleep(3)
-        send_pavlok_stimulus(stimulus_type="vibe", value=50, reason="one_claude_remaining", respect_cooldown=False)
+        await asyncio.to_thread(send_pavlok_stimulus, stimulus_type="vibe", value=50, reason="one_claude_remaining", respect_cooldown=False)
         await log_event("instance_count_warning", details={"remaining": 1, "was": was_active})
     elif remaining_active == 0 and was_active >= 1:
         print(f"PAVLOK: All Claude instances stopped, zap")
-        send_pavlok_stimulus(stimulus_type="zap", value=50, reason="all_claudes_stopped", respect_cooldown=False)
+        await asyncio.to_thread(send_pavlok_stimulus, stimulus_type="zap", value=50, reason="all_claudes_stopped", respect_cooldown=False)
         await log_event("instance_count_zero", details={"was": was_active})
 
 
@@ -3662,27 +4106,23 @@ async def check_instance_count_pavlok(remaining_active: int, was_active: int):
 def _sync_log_shift(old_mode: str | None, new_mode: str, trigger: str, source: str,
                     phone_app: str | None = None, details: str | None = None):
     """Log a timer mode shift to the analytics table (sync, for thread offload)."""
-    import sqlite3
     from datetime import datetime as _dt
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA busy_timeout=5000")
+    with sync_db_connection() as conn:
+        # Get active non-subagent instance count
+        cursor = conn.execute(
+            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle') AND COALESCE(is_subagent, 0) = 0"
+        )
+        active_instances = cursor.fetchone()[0]
 
-    # Get active non-subagent instance count
-    cursor = conn.execute(
-        "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle') AND COALESCE(is_subagent, 0) = 0"
-    )
-    active_instances = cursor.fetchone()[0]
-
-    conn.execute(
-        """INSERT INTO timer_shifts (timestamp, old_mode, new_mode, trigger, source,
-           break_balance_ms, break_backlog_ms, work_time_ms, active_instances, phone_app, details)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (_dt.now().isoformat(), old_mode, new_mode, trigger, source,
-         timer_engine.break_balance_ms, abs(min(0, timer_engine.break_balance_ms)),
-         timer_engine.total_work_time_ms, active_instances, phone_app, details)
-    )
-    conn.commit()
-    conn.close()
+        conn.execute(
+            """INSERT INTO timer_shifts (timestamp, old_mode, new_mode, trigger, source,
+               break_balance_ms, break_backlog_ms, work_time_ms, active_instances, phone_app, details)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (_dt.now().isoformat(), old_mode, new_mode, trigger, source,
+             timer_engine.break_balance_ms, abs(min(0, timer_engine.break_balance_ms)),
+             timer_engine.total_work_time_ms, active_instances, phone_app, details)
+        )
+        conn.commit()
 
 
 async def timer_log_shift(old_mode: str | None, new_mode: str, trigger: str, source: str,
@@ -3702,18 +4142,14 @@ def _sync_generate_daily_analytics(date_str: str):
     2. Full JSON to Imperium-ENV/Journal/Daily/analytics/ for programmatic access
     Then wipes timer_shifts table.
     """
-    import sqlite3
     import json
     from collections import defaultdict
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA busy_timeout=5000")
-    conn.row_factory = sqlite3.Row
-
-    rows = conn.execute("SELECT * FROM timer_shifts ORDER BY id").fetchall()
+    with sync_db_connection() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("SELECT * FROM timer_shifts ORDER BY id").fetchall()
 
     if not rows:
-        conn.close()
         return None
 
     # Compute analytics
@@ -3784,9 +4220,9 @@ def _sync_generate_daily_analytics(date_str: str):
         note_path.write_text(updated, encoding="utf-8")
 
     # Wipe timer_shifts table
-    conn.execute("DELETE FROM timer_shifts")
-    conn.commit()
-    conn.close()
+    with sync_db_connection() as conn:
+        conn.execute("DELETE FROM timer_shifts")
+        conn.commit()
 
     return str(out_path)
 
@@ -3864,7 +4300,6 @@ def _format_yaml_value(value) -> str:
 
 def _sync_update_daily_note():
     """Update daily note synchronically (called via asyncio.to_thread)."""
-    import sqlite3
     today = datetime.now().strftime("%Y-%m-%d")
     note_path = OBSIDIAN_DAILY_PATH / f"{today}.md"
     if not note_path.exists():
@@ -3874,15 +4309,13 @@ def _sync_update_daily_note():
     session_count = 0
     mode_change_count = 0
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("PRAGMA busy_timeout=5000")
-        session_count = conn.execute(
-            "SELECT COUNT(*) FROM timer_sessions WHERE date = ?", (today,)
-        ).fetchone()[0] or 0
-        mode_change_count = conn.execute(
-            "SELECT COUNT(*) FROM timer_mode_changes WHERE timestamp LIKE ?", (f"{today}%",)
-        ).fetchone()[0] or 0
-        conn.close()
+        with sync_db_connection() as conn:
+            session_count = conn.execute(
+                "SELECT COUNT(*) FROM timer_sessions WHERE date = ?", (today,)
+            ).fetchone()[0] or 0
+            mode_change_count = conn.execute(
+                "SELECT COUNT(*) FROM timer_mode_changes WHERE timestamp LIKE ?", (f"{today}%",)
+            ).fetchone()[0] or 0
     except Exception:
         pass  # Silently skip if DB query fails
     
@@ -3914,24 +4347,21 @@ async def timer_update_daily_note():
 
 def _sync_save_to_db(state_json: str):
     """Save timer state to SQLite synchronously (called via asyncio.to_thread)."""
-    import sqlite3
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA busy_timeout=5000")
-    conn.execute(
-        """INSERT INTO timer_state (id, state_json, updated_at)
-           VALUES (1, ?, CURRENT_TIMESTAMP)
-           ON CONFLICT(id) DO UPDATE SET state_json = excluded.state_json, updated_at = CURRENT_TIMESTAMP""",
-        (state_json,)
-    )
-    conn.commit()
-    conn.close()
+    with sync_db_connection() as conn:
+        conn.execute(
+            """INSERT INTO timer_state (id, state_json, updated_at)
+               VALUES (1, ?, CURRENT_TIMESTAMP)
+               ON CONFLICT(id) DO UPDATE SET state_json = excluded.state_json, updated_at = CURRENT_TIMESTAMP""",
+            (state_json,)
+        )
+        conn.commit()
 
 
 async def timer_save_to_db():
     """Save timer state to SQLite asynchronously."""
     try:
         now_ms = int(time.monotonic() * 1000)
-        state_json = json.dumps(timer_engine.to_dict(now_ms))
+        state_json = dumps_json(timer_engine.to_dict(now_ms))
         await asyncio.to_thread(_sync_save_to_db, state_json)
     except Exception as e:
         print(f"TIMER: Failed to save to DB: {e}")
@@ -3939,17 +4369,14 @@ async def timer_save_to_db():
 
 def _sync_log_mode_change(old_mode: str | None, new_mode: str, is_automatic: bool):
     """Log a mode change to the database synchronously."""
-    import sqlite3
     from datetime import datetime
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA busy_timeout=5000")
-    conn.execute(
-        """INSERT INTO timer_mode_changes (timestamp, old_mode, new_mode, is_automatic)
-           VALUES (?, ?, ?, ?)""",
-        (datetime.now().isoformat(), old_mode, new_mode, 1 if is_automatic else 0)
-    )
-    conn.commit()
-    conn.close()
+    with sync_db_connection() as conn:
+        conn.execute(
+            """INSERT INTO timer_mode_changes (timestamp, old_mode, new_mode, is_automatic)
+               VALUES (?, ?, ?, ?)""",
+            (datetime.now().isoformat(), old_mode, new_mode, 1 if is_automatic else 0)
+        )
+        conn.commit()
 
 
 async def timer_log_mode_change(old_mode: str | None, new_mode: str, is_automatic: bool):
@@ -3962,19 +4389,15 @@ async def timer_log_mode_change(old_mode: str | None, new_mode: str, is_automati
 
 def _sync_start_session(mode: str, date: str):
     """Start a new timer session."""
-    import sqlite3
     from datetime import datetime
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA busy_timeout=5000")
-    cursor = conn.execute(
-        """INSERT INTO timer_sessions (date, start_time, mode)
-           VALUES (?, ?, ?)""",
-        (date, datetime.now().isoformat(), mode)
-    )
-    conn.commit()
-    session_id = cursor.lastrowid
-    conn.close()
-    return session_id
+    with sync_db_connection() as conn:
+        cursor = conn.execute(
+            """INSERT INTO timer_sessions (date, start_time, mode)
+               VALUES (?, ?, ?)""",
+            (date, datetime.now().isoformat(), mode)
+        )
+        conn.commit()
+        return cursor.lastrowid
 
 
 async def timer_start_session(mode: str, date: str) -> int:
@@ -3988,17 +4411,14 @@ async def timer_start_session(mode: str, date: str) -> int:
 
 def _sync_end_session(session_id: int, duration_ms: int, break_earned_ms: int = 0, break_used_ms: int = 0):
     """End a timer session."""
-    import sqlite3
     from datetime import datetime
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA busy_timeout=5000")
-    conn.execute(
-        """UPDATE timer_sessions SET end_time = ?, duration_ms = ?, break_earned_ms = ?, break_used_ms = ?
-           WHERE id = ?""",
-        (datetime.now().isoformat(), duration_ms, break_earned_ms, break_used_ms, session_id)
-    )
-    conn.commit()
-    conn.close()
+    with sync_db_connection() as conn:
+        conn.execute(
+            """UPDATE timer_sessions SET end_time = ?, duration_ms = ?, break_earned_ms = ?, break_used_ms = ?
+               WHERE id = ?""",
+            (datetime.now().isoformat(), duration_ms, break_earned_ms, break_used_ms, session_id)
+        )
+        conn.commit()
 
 
 async def timer_end_session(session_id: int, duration_ms: int, break_earned_ms: int = 0, break_used_ms: int = 0):
@@ -4011,23 +4431,20 @@ async def timer_end_session(session_id: int, duration_ms: int, break_earned_ms:
 
 def _sync_save_daily_score(date: str, productivity_score: int, total_work_ms: int, total_break_used_ms: int, session_count: int, mode_change_count: int):
     """Save daily productivity score."""
-    import sqlite3
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA busy_timeout=5000")
-    conn.execute(
-        """INSERT INTO timer_daily_scores (date, productivity_score, total_work_ms, total_break_used_ms, session_count, mode_change_count, updated_at)
-           VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-           ON CONFLICT(date) DO UPDATE SET 
-               productivity_score = excluded.productivity_score,
-               total_work_ms = excluded.total_work_ms,
-               total_break_used_ms = excluded.total_break_used_ms,
-               session_count = excluded.session_count,
-               mode_change_count = excluded.mode_change_count,
-               updated_at = CURRENT_TIMESTAMP""",
-        (date, productivity_score, total_work_ms, total_break_used_ms, session_count, mode_change_count)
-    )
-    conn.commit()
-    conn.close()
+    with sync_db_connection() as conn:
+        conn.execute(
+            """INSERT INTO timer_daily_scores (date, productivity_score, total_work_ms, total_break_used_ms, session_count, mode_change_count, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+               ON CONFLICT(date) DO UPDATE SET 
+                   productivity_score = excluded.productivity_score,
+                   total_work_ms = excluded.total_work_ms,
+                   total_break_used_ms = excluded.total_break_used_ms,
+                   session_count = excluded.session_count,
+                   mode_change_count = excluded.mode_change_count,
+                   updated_at = CURRENT_TIMESTAMP""",
+            (date, productivity_score, total_work_ms, total_break_used_ms, session_count, mode_change_count)
+        )
+        conn.commit()
 
 
 async def timer_save_daily_score(date: str, productivity_score: int, total_work_ms: int, total_break_used_ms: int, session_count: int, mode_change_count: int):
@@ -4040,13 +4457,10 @@ async def timer_save_daily_score(date: str, productivity_score: int, total_work_
 
 def timer_load_from_db():
     """Load timer state from DB on startup."""
-    import sqlite3
     now_ms = int(time.monotonic() * 1000)
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("PRAGMA busy_timeout=5000")
-        row = conn.execute("SELECT state_json FROM timer_state WHERE id = 1").fetchone()
-        conn.close()
+        with sync_db_connection() as conn:
+            row = conn.execute("SELECT state_json FROM timer_state WHERE id = 1").fetchone()
 
         if row:
             saved = json.loads(row[0])
@@ -4062,7 +4476,6 @@ def timer_load_from_db():
 
 async def timer_9am_reset():
     """9 AM daily reset: clear accumulated break, wipe prior-day timer events."""
-    import sqlite3
     today = datetime.now().strftime("%Y-%m-%d")
     now_ms = int(time.monotonic() * 1000)
 
@@ -4072,14 +4485,12 @@ async def timer_9am_reset():
     # Wipe timer_mode_change and break events from previous days
     try:
         def _wipe_old_timer_events():
-            conn = sqlite3.connect(DB_PATH)
-            conn.execute("PRAGMA busy_timeout=5000")
-            conn.execute(
-                "DELETE FROM events WHERE event_type IN ('timer_mode_change','break_exhausted_enforcement')"
-                " AND DATE(created_at) < DATE('now','localtime')"
-            )
-            conn.commit()
-            conn.close()
+            with sync_db_connection() as conn:
+                conn.execute(
+                    "DELETE FROM events WHERE event_type IN ('timer_mode_change','break_exhausted_enforcement')"
+                    " AND DATE(created_at) < DATE('now','localtime')"
+                )
+                conn.commit()
 
         await asyncio.to_thread(_wipe_old_timer_events)
     except Exception as e:
@@ -4171,7 +4582,7 @@ def check_audio_receiver_running() -> dict:
     return {"running": False, "pid": None}
 
 
-def close_distraction_windows() -> dict:
+async def close_distraction_windows() -> dict:
     """
     Close distraction windows on Windows via token-satellite.
 
@@ -4192,10 +4603,10 @@ def close_distraction_windows() -> dict:
         logger.info(f"ENFORCE: No targets for mode '{current_mode}'")
         return {"success": True, "closed_count": 0, "mode": current_mode}
 
-    results = []
-    for app in targets:
-        result = enforce_desktop_app(app, "close")
-        results.append(result)
+    # Satellite calls are blocking HTTP; run them off the event loop
+    results = await asyncio.gather(
+        *(asyncio.to_thread(enforce_desktop_app, app, "close") for app in targets)
+    )
 
     closed = sum(1 for r in results if r.get("success"))
     logger.info(f"ENFORCE: Closed {closed}/{len(targets)} targets for mode '{current_mode}'")
@@ -4211,7 +4622,7 @@ def enforce_desktop_app(app_name: str, action: str = "close") -> dict:
     url = f"http://{host}:{port}/enforce"
 
     try:
-        response = requests.post(
+        response = satellite_http.post(
             url,
             json={"app": app_name, "action": action},
             timeout=timeout,
@@ -4238,7 +4649,7 @@ def check_desktop_reachable() -> dict:
     url = f"http://{host}:{port}/health"
 
     try:
-        response = requests.get(url, timeout=timeout)
+        response = satellite_http.get(url, timeout=timeout)
         DESKTOP_STATE["ahk_reachable"] = True
         DESKTOP_STATE["ahk_last_heartbeat"] = datetime.now().isoformat()
         return {"reachable": True, "status_code": response.status_code}
@@ -4497,9 +4908,9 @@ def stop_enforcement_cascade(reason: str = "app_close"):
         cascade["task"].cancel()
     cascade["task"] = None
 
-    asyncio.ensure_future(log_event("enforcement_cascade_stop", device_id="phone",
-                                     details={"app": app, "level": level,
-                                              "elapsed_s": round(elapsed), "reason": reason}))
+    enqueue_event("enforcement_cascade_stop", device_id="phone",
+                  details={"app": app, "level": level,
+                           "elapsed_s": round(elapsed), "reason": reason})
 
 
 def check_phone_reachable() -> dict:
@@ -4539,13 +4950,8 @@ async def check_window_enforcement(request: WindowCheckRequest = None):
     - If productivity is active -> distractions are allowed (earned break)
     - If productivity is NOT active -> distractions should be closed
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        # Count active Claude instances
-        cursor = await db.execute(
-            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle')"
-        )
-        row = await cursor.fetchone()
-        active_count = row[0] if row else 0
+    # Count active Claude instances
+    active_count = await get_active_instance_count()
 
     productivity_active = active_count > 0
     should_close = not productivity_active
@@ -4579,7 +4985,16 @@ async def check_window_enforcement(request: WindowCheckRequest = None):
 @app.get("/api/window/enforce", response_model=WindowEnforceResponse)
 async def check_window_enforcement_get():
     """GET version of window enforcement check (simpler for AHK to call)."""
-    return await check_window_enforcement(None)
+    now = time.monotonic()
+    cached = INSTANCE_STATE["enforce_response"]
+    if cached is not None and now - INSTANCE_STATE["enforce_at"] < ENFORCE_RESPONSE_TTL:
+        return cached
+    generation = INSTANCE_STATE["generation"]
+    response = await check_window_enforcement(None)
+    if INSTANCE_STATE["generation"] == generation:
+        INSTANCE_STATE["enforce_response"] = response
+        INSTANCE_STATE["enforce_at"] = now
+    return response
 
 
 @app.post("/api/window/close")
@@ -4588,7 +5003,7 @@ async def trigger_window_close():
     Manually trigger closing of distraction windows.
     This is a push-based enforcement that token-api executes directly.
     """
-    result = close_distraction_windows()
+    result = await close_distraction_windows()
 
     await log_event(
         "manual_enforcement",
@@ -4636,14 +5051,7 @@ async def handle_desktop_detection(request: DesktopDetectionRequest):
     # Check if mode change is needed
     if detected_mode == current_mode:
         print(f"    Mode unchanged ({detected_mode}), skipping")
-        return DesktopDetectionResponse(
-            action="none",
-            detected_mode=detected_mode,
-            reason="mode_unchanged",
-            productivity_active=True,
-            active_instance_count=0,
-            timer_updated=False
-        )
+        return UNCHANGED_DETECTION_RESPONSES[detected_mode]
 
     # Startup grace period: ignore transitions TO silence for N seconds after
     # server start. AHK restarts detect silence before catching real audio state.
@@ -4663,12 +5071,7 @@ async def handle_desktop_detection(request: DesktopDetectionRequest):
             )
 
     # Check productivity status
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle')"
-        )
-        row = await cursor.fetchone()
-        active_count = row[0] if row else 0
+    active_count = await get_active_instance_count()
 
     productivity_active = active_count > 0
 
@@ -4774,8 +5177,8 @@ async def handle_desktop_detection(request: DesktopDetectionRequest):
         # Mode change blocked - immediately enforce by closing distraction windows
         print(f"<<< Mode change BLOCKED: {detected_mode} | reason={reason}")
 
-        enforce_result = close_distraction_windows()
-        send_pavlok_stimulus(reason="desktop_distraction_blocked")
+        enforce_result = await close_distraction_windows()
+        await asyncio.to_thread(send_pavlok_stimulus, reason="desktop_distraction_blocked")
 
         await log_event(
             "desktop_mode_blocked",
@@ -4826,7 +5229,7 @@ async def handle_desktop_heartbeat(request: dict):
 @app.post("/desktop/enforce")
 async def manual_enforce_desktop(app: str = "brave", action: str = "close"):
     """Manually trigger desktop enforcement via token-satellite (for testing)."""
-    result = enforce_desktop_app(app, action)
+    result = await asyncio.to_thread(enforce_desktop_app, app, action)
 
     await log_event(
         "desktop_manual_enforcement",
@@ -4839,7 +5242,7 @@ async def manual_enforce_desktop(app: str = "brave", action: str = "close"):
 @app.get("/desktop/ping")
 async def ping_desktop():
     """Check if Windows satellite server is reachable."""
-    result = check_desktop_reachable()
+    result = await asyncio.to_thread(check_desktop_reachable)
     return result
 
 
@@ -4849,7 +5252,7 @@ async def restart_satellite_proxy():
     host = DESKTOP_CONFIG["host"]
     port = DESKTOP_CONFIG["port"]
     try:
-        requests.post(f"http://{host}:{port}/restart", timeout=3)
+        await asyncio.to_thread(satellite_http.post, f"http://{host}:{port}/restart", timeout=3)
         return {"success": True}
     except requests.exceptions.Timeout:
         return {"success": True, "note": "timeout expected during restart"}
@@ -5011,11 +5414,11 @@ async def handle_phone_activity(request: PhoneActivityRequest):
         # Log focus auto-exit on phone distraction
         if was_focused and not timer_engine.focus_active:
             focus_min = round(timer_engine.total_focus_time_ms / 60000)
-            asyncio.ensure_future(log_event("focus_toggle", details={
+            enqueue_event("focus_toggle", details={
                 "action": "off", "trigger": "phone_distraction", "app": app_name,
                 "total_focus_time_ms": timer_engine.total_focus_time_ms,
                 "focus_cutoff_time": timer_engine.focus_cutoff_time,
-            }))
+            })
             loop = asyncio.get_event_loop()
             loop.run_in_executor(None, speak_tts, f"Focus broken by phone. {focus_min} minutes earned.")
         # Track Twitter open time for 7-minute enforcement
@@ -5064,12 +5467,7 @@ async def handle_phone_activity(request: PhoneActivityRequest):
     break_secs = round(timer_engine.break_balance_ms / 1000)
 
     # Check productivity (active Claude instances)
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle')"
-        )
-        row = await cursor.fetchone()
-        active_count = row[0] if row else 0
+    active_count = await get_active_instance_count()
 
     productivity_active = active_count > 0
 
@@ -5174,14 +5572,14 @@ async def get_phone_state():
 @app.get("/phone/ping")
 async def ping_phone():
     """Check if phone is reachable."""
-    result = check_phone_reachable()
+    result = await asyncio.to_thread(check_phone_reachable)
     return result
 
 
 @app.post("/phone/enforce")
 async def manual_enforce_phone(app: str, action: str = "disable"):
     """Manually trigger phone enforcement (for testing)."""
-    result = enforce_phone_app(app, action)
+    result = await asyncio.to_thread(enforce_phone_app, app, action)
     return result
 
 
@@ -5415,7 +5813,7 @@ async def get_timer_shifts():
         reset_today -= timedelta(days=1)
     cutoff = reset_today.isoformat()
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM timer_shifts WHERE timestamp >= ? ORDER BY id",
@@ -5660,7 +6058,8 @@ async def pavlok_zap(
     reason: str = "manual",
 ):
     """Send a stimulus to the Pavlok watch. Bypasses cooldown for manual triggers."""
-    result = send_pavlok_stimulus(
+    result = await asyncio.to_thread(
+        send_pavlok_stimulus,
         stimulus_type=type,
         value=value,
         reason=reason,
@@ -5701,52 +6100,51 @@ async def pavlok_status():
 # ============ Work Mode / Geofence Endpoints ============
 # MacroDroid uses geofence to send work mode changes
 
-class WorkModeRequest(BaseModel):
+class WorkModeRequest(FastModel):
     mode: str = Field(..., description="Work mode: clocked_in, clocked_out, gym")
     source: str = Field(default="api", description="Source of the request (macrodroid, manual, etc)")
     token: Optional[str] = Field(default=None, description="Optional auth token for MacroDroid")
 
 
+# Last serialized /api/work-mode body, keyed by the values it was built from
+_WORK_MODE_CACHE = {"key": None, "body": b""}
+
+
 @app.get("/api/work-mode")
 async def get_work_mode():
-    """Get current work mode status."""
-    return {
-        "work_mode": DESKTOP_STATE.get("work_mode", "clocked_in"),
-        "work_mode_changed_at": DESKTOP_STATE.get("work_mode_changed_at"),
-        "current_timer_mode": DESKTOP_STATE.get("current_mode", "silence"),
-    }
+    """Get current work mode status (polled; re-serialized only when it changes)."""
+    key = (
+        DESKTOP_STATE.get("work_mode", "clocked_in"),
+        DESKTOP_STATE.get("work_mode_changed_at"),
+        DESKTOP_STATE.get("current_mode", "silence"),
+    )
+    if _WORK_MODE_CACHE["key"] != key:
+        _WORK_MODE_CACHE["body"] = orjson.dumps({
+            "work_mode": key[0],
+            "work_mode_changed_at": key[1],
+            "current_timer_mode": key[2],
+        })
+        _WORK_MODE_CACHE["key"] = key
+    return Response(content=_WORK_MODE_CACHE["body"], media_type="application/json")
 
 
-@app.post("/api/work-mode")
-async def set_work_mode(request: WorkModeRequest):
-    """
-    Set work mode. Called by MacroDroid geofence or manual toggle.
+VALID_WORK_MODES = ("clocked_in", "clocked_out", "gym")
 
-    Modes:
-    - clocked_in: Normal enforcement (video requires productivity)
-    - clocked_out: No enforcement, all modes allowed
-    - gym: Gym timer mode, triggers gym timer in Obsidian
 
-    MacroDroid can send:
-    - POST /api/work-mode {"mode": "clocked_in", "source": "macrodroid"}
-    - POST /api/work-mode {"mode": "gym", "source": "macrodroid"}
-    """
-    valid_modes = ["clocked_in", "clocked_out", "gym"]
-    if request.mode not in valid_modes:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid work mode '{request.mode}'. Valid: {valid_modes}"
-        )
+async def apply_work_mode(new_mode: str, source: str) -> tuple[str, bool]:
+    """Switch work mode and log it. Returns (old_mode, timer_updated).
 
+    Shared by /api/work-mode and the quick clock-in/clock-out endpoints.
+    """
     old_mode = DESKTOP_STATE.get("work_mode", "clocked_in")
-    DESKTOP_STATE["work_mode"] = request.mode
+    DESKTOP_STATE["work_mode"] = new_mode
     DESKTOP_STATE["work_mode_changed_at"] = datetime.now().isoformat()
 
-    print(f">>> Work mode changed: {old_mode} -> {request.mode} (source: {request.source})")
+    print(f">>> Work mode changed: {old_mode} -> {new_mode} (source: {source})")
 
     # If switching to gym mode, set idle timeout exempt
     timer_updated = False
-    if request.mode == "gym":
+    if new_mode == "gym":
         timer_engine.idle_timeout_exempt = True
         timer_updated = True
 
@@ -5754,11 +6152,35 @@ async def set_work_mode(request: WorkModeRequest):
         "work_mode_change",
         details={
             "old_mode": old_mode,
-            "new_mode": request.mode,
-            "source": request.source,
+            "new_mode": new_mode,
+            "source": source,
             "timer_updated": timer_updated,
         }
     )
+    return old_mode, timer_updated
+
+
+@app.post("/api/work-mode")
+async def set_work_mode(request: WorkModeRequest):
+    """
+    Set work mode. Called by MacroDroid geofence or manual toggle.
+
+    Modes:
+    - clocked_in: Normal enforcement (video requires productivity)
+    - clocked_out: No enforcement, all modes allowed
+    - gym: Gym timer mode, triggers gym timer in Obsidian
+
+    MacroDroid can send:
+    - POST /api/work-mode {"mode": "clocked_in", "source": "macrodroid"}
+    - POST /api/work-mode {"mode": "gym", "source": "macrodroid"}
+    """
+    if request.mode not in VALID_WORK_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid work mode '{request.mode}'. Valid: {list(VALID_WORK_MODES)}"
+        )
+
+    old_mode, timer_updated = await apply_work_mode(request.mode, request.source)
 
     return {
         "status": "success",
@@ -5783,7 +6205,7 @@ LOCATION_MODE_MAP = {
 }
 
 
-class LocationEventRequest(BaseModel):
+class LocationEventRequest(FastModel):
     location: str = Field(..., description="Location name: home, gym, work")
     action: str = Field(..., description="enter or exit")
     source: str = Field(default="macrodroid", description="Source of the event")
@@ -5885,18 +6307,14 @@ async def handle_location_event(request: LocationEventRequest):
 @app.post("/api/clock-out")
 async def clock_out():
     """Quick endpoint to clock out (disable enforcement)."""
-    DESKTOP_STATE["work_mode"] = "clocked_out"
-    DESKTOP_STATE["work_mode_changed_at"] = datetime.now().isoformat()
-    await log_event("work_mode_change", details={"new_mode": "clocked_out", "source": "quick_api"})
+    await apply_work_mode("clocked_out", "quick_api")
     return {"status": "clocked_out", "message": "Enforcement disabled"}
 
 
 @app.post("/api/clock-in")
 async def clock_in():
     """Quick endpoint to clock in (enable enforcement)."""
-    DESKTOP_STATE["work_mode"] = "clocked_in"
-    DESKTOP_STATE["work_mode_changed_at"] = datetime.now().isoformat()
-    await log_event("work_mode_change", details={"new_mode": "clocked_in", "source": "quick_api"})
+    await apply_work_mode("clocked_in", "quick_api")
     return {"status": "clocked_in", "message": "Enforcement enabled"}
 
 
@@ -5913,7 +6331,7 @@ async def submit_checkin(request: CheckinSubmit):
     now = datetime.now().isoformat()
 
     # Upsert the check-in response
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Check if a prompt row exists (created by trigger_checkin)
         cursor = await db.execute(
             "SELECT id, prompted_at FROM checkins WHERE checkin_type = ? AND date = ?",
@@ -5965,7 +6383,7 @@ async def get_today_checkins():
     """Return all check-ins for today with completion status."""
     today = datetime.now().strftime("%Y-%m-%d")
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM checkins WHERE date = ? ORDER BY prompted_at",
@@ -5999,7 +6417,7 @@ async def get_checkin_status():
     today = datetime.now().strftime("%Y-%m-%d")
     now = datetime.now()
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT checkin_type, responded_at FROM checkins WHERE date = ?",
@@ -6059,7 +6477,7 @@ async def log_debug_event(request: LogEventRequest):
 async def get_recent_events(limit: int = 10):
     """Get recent events with instance name data (LEFT JOIN)."""
     limit = min(limit, 100)
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_reader() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("""
             SELECT e.*, ci.tab_name as instance_tab_name, ci.working_dir as instance_working_dir
@@ -6075,7 +6493,7 @@ async def get_recent_events(limit: int = 10):
             event = dict(row)
             if event.get("details"):
                 try:
-                    event["details"] = json.loads(event["details"])
+                    event["details"] = orjson.loads(event["details"])
                 except Exception:
                     pass
             events.append(event)
@@ -6086,7 +6504,7 @@ async def get_recent_events(limit: int = 10):
 @app.get("/api/devices")
 async def list_devices():
     """List all known devices."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_reader() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("SELECT * FROM devices")
         rows = await cursor.fetchall()
@@ -6102,8 +6520,6 @@ async def audio_proxy_connect(request: AudioProxyConnectRequest):
     Called by MacroDroid when phone connects to PC via Bluetooth.
     Starts the audio receiver on Windows to prepare for incoming audio stream.
     """
-    global AUDIO_PROXY_STATE
-
     # Check if already connected
     if AUDIO_PROXY_STATE["phone_connected"]:
         # Verify receiver is actually running
@@ -6120,11 +6536,13 @@ async def audio_proxy_connect(request: AudioProxyConnectRequest):
     result = start_audio_receiver()
 
     if result.get("success"):
-        # Update state
-        AUDIO_PROXY_STATE["phone_connected"] = True
-        AUDIO_PROXY_STATE["receiver_running"] = True
-        AUDIO_PROXY_STATE["receiver_pid"] = result.get("pid")
-        AUDIO_PROXY_STATE["last_connect_time"] = datetime.now().isoformat()
+        # Update state (one update, no await in between: atomic on the loop)
+        AUDIO_PROXY_STATE.update(
+            phone_connected=True,
+            receiver_running=True,
+            receiver_pid=result.get("pid"),
+            last_connect_time=datetime.now().isoformat(),
+        )
 
         # Log event
         await log_event(
@@ -6172,16 +6590,16 @@ async def audio_proxy_disconnect(request: AudioProxyDisconnectRequest):
     Called by MacroDroid when phone disconnects from PC Bluetooth.
     Stops the audio receiver and cleans up.
     """
-    global AUDIO_PROXY_STATE
-
     # Stop the audio receiver
     result = stop_audio_receiver()
 
     # Update state
-    AUDIO_PROXY_STATE["phone_connected"] = False
-    AUDIO_PROXY_STATE["receiver_running"] = False
-    AUDIO_PROXY_STATE["receiver_pid"] = None
-    AUDIO_PROXY_STATE["last_disconnect_time"] = datetime.now().isoformat()
+    AUDIO_PROXY_STATE.update(
+        phone_connected=False,
+        receiver_running=False,
+        receiver_pid=None,
+        last_disconnect_time=datetime.now().isoformat(),
+    )
 
     # Log event
     await log_event(
@@ -6275,9 +6693,23 @@ async def system_shutdown(request: ShutdownRequest):
     cmd.append(f"+{delay_minutes}" if delay_minutes > 0 else "now")
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=10)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logger.error(f"SYSTEM: {action} command timed out")
+            return ShutdownResponse(
+                success=False, action=action, delay_seconds=request.delay_seconds,
+                message=f"{action} command timed out"
+            )
 
-        if result.returncode == 0:
+        if proc.returncode == 0:
             logger.info(f"SYSTEM: Initiated {action} with delay={delay_minutes}min")
             return ShutdownResponse(
                 success=True,
@@ -6286,7 +6718,7 @@ async def system_shutdown(request: ShutdownRequest):
                 message=f"System {action} initiated" + (f" in {delay_minutes} minutes" if delay_minutes > 0 else "")
             )
         else:
-            error_msg = result.stderr.strip() or result.stdout.strip()
+            error_msg = stderr.decode().strip() or stdout.decode().strip()
             logger.error(f"SYSTEM: Failed to {action}: {error_msg}")
             return ShutdownResponse(
                 success=False, action=action, delay_seconds=request.delay_seconds,
@@ -6303,15 +6735,22 @@ async def system_shutdown(request: ShutdownRequest):
 async def cancel_shutdown():
     """Cancel a pending shutdown/restart."""
     try:
-        result = subprocess.run(
-            ["sudo", "killall", "shutdown"],
-            capture_output=True, text=True, timeout=10
+        proc = await asyncio.create_subprocess_exec(
+            "sudo", "killall", "shutdown",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
-        if result.returncode == 0:
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=10)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return {"success": False, "message": "Cancel command timed out"}
+        if proc.returncode == 0:
             logger.info("SYSTEM: Cancelled pending shutdown")
             return {"success": True, "message": "Shutdown cancelled"}
         else:
-            return {"success": False, "message": f"No pending shutdown or cancel failed: {result.stderr.strip()}"}
+            return {"success": False, "message": f"No pending shutdown or cancel failed: {stderr.decode().strip()}"}
     except Exception as e:
         return {"success": False, "message": str(e)}
 
@@ -6371,59 +6810,104 @@ async def kvm_status():
 @app.get("/api/tasks", response_model=List[TaskResponse])
 async def list_tasks():
     """List all scheduled tasks with their status."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("SELECT * FROM scheduled_tasks ORDER BY id")
         tasks = await cursor.fetchall()
 
+        # Latest execution per task in one query instead of one per task
+        cursor = await db.execute(
+            """SELECT task_id, status, started_at, duration_ms FROM (
+                   SELECT task_id, status, started_at, duration_ms,
+                          ROW_NUMBER() OVER (PARTITION BY task_id ORDER BY started_at DESC) AS rn
+                   FROM task_executions
+               ) WHERE rn = 1"""
+        )
+        last_runs = {
+            row["task_id"]: {
+                "status": row["status"],
+                "started_at": row["started_at"],
+                "duration_ms": row["duration_ms"]
+            }
+            for row in await cursor.fetchall()
+        }
+
+        # One jobstore scan for all next-run times
+        jobs_by_id = {job.id: job for job in scheduler.get_jobs()}
+
         result = []
         for task in tasks:
             task_dict = dict(task)
             task_id = task_dict["id"]
-
-            # Get last execution
-            cursor = await db.execute(
-                """SELECT * FROM task_executions
-                   WHERE task_id = ?
-                   ORDER BY started_at DESC LIMIT 1""",
-                (task_id,)
-            )
-            last_exec = await cursor.fetchone()
-
-            last_run = None
-            if last_exec:
-                last_exec_dict = dict(last_exec)
-                last_run = {
-                    "status": last_exec_dict["status"],
-                    "started_at": last_exec_dict["started_at"],
-                    "duration_ms": last_exec_dict["duration_ms"]
-                }
+            last_run = last_runs.get(task_id)
 
             # Get next run time from scheduler
             next_run = None
-            job = scheduler.get_job(task_id)
+            job = jobs_by_id.get(task_id)
             if job and job.next_run_time:
                 next_run = job.next_run_time.isoformat()
 
-            result.append(TaskResponse(
-                id=task_dict["id"],
-                name=task_dict["name"],
-                description=task_dict["description"],
-                task_type=task_dict["task_type"],
-                schedule=task_dict["schedule"],
-                enabled=bool(task_dict["enabled"]),
-                max_retries=task_dict["max_retries"],
-                last_run=last_run,
-                next_run=next_run
-            ))
+            # Plain dicts in TaskResponse's shape; rows come from our own
+            # schema, so re-validating them through the model is wasted work
+            result.append({
+                "id": task_dict["id"],
+                "name": task_dict["name"],
+                "description": task_dict["description"],
+                "task_type": task_dict["task_type"],
+                "schedule": task_dict["schedule"],
+                "enabled": bool(task_dict["enabled"]),
+                "max_retries": task_dict["max_retries"],
+                "last_run": last_run,
+                "next_run": next_run
+            })
 
-        return result
+    return Response(content=orjson.dumps(result), media_type="application/json")
+
+
+async def _build_task_response(db: aiosqlite.Connection, task_dict: dict) -> TaskResponse:
+    """TaskResponse for a scheduled_tasks row, with last run and next run time."""
+    task_id = task_dict["id"]
+
+    # Get last execution
+    cursor = await db.execute(
+        """SELECT status, started_at, duration_ms FROM task_executions
+           WHERE task_id = ?
+           ORDER BY started_at DESC LIMIT 1""",
+        (task_id,)
+    )
+    last_exec = await cursor.fetchone()
+
+    last_run = None
+    if last_exec:
+        last_run = {
+            "status": last_exec[0],
+            "started_at": last_exec[1],
+            "duration_ms": last_exec[2]
+        }
+
+    # Get next run time
+    next_run = None
+    job = scheduler.get_job(task_id)
+    if job and job.next_run_time:
+        next_run = job.next_run_time.isoformat()
+
+    return TaskResponse(
+        id=task_dict["id"],
+        name=task_dict["name"],
+        description=task_dict["description"],
+        task_type=task_dict["task_type"],
+        schedule=task_dict["schedule"],
+        enabled=bool(task_dict["enabled"]),
+        max_retries=task_dict["max_retries"],
+        last_run=last_run,
+        next_run=next_run
+    )
 
 
 @app.get("/api/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(task_id: str):
     """Get details of a specific task."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM scheduled_tasks WHERE id = ?",
@@ -6434,49 +6918,13 @@ async def get_task(task_id: str):
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task_dict = dict(task)
-
-        # Get last execution
-        cursor = await db.execute(
-            """SELECT * FROM task_executions
-               WHERE task_id = ?
-               ORDER BY started_at DESC LIMIT 1""",
-            (task_id,)
-        )
-        last_exec = await cursor.fetchone()
-
-        last_run = None
-        if last_exec:
-            last_exec_dict = dict(last_exec)
-            last_run = {
-                "status": last_exec_dict["status"],
-                "started_at": last_exec_dict["started_at"],
-                "duration_ms": last_exec_dict["duration_ms"]
-            }
-
-        # Get next run time
-        next_run = None
-        job = scheduler.get_job(task_id)
-        if job and job.next_run_time:
-            next_run = job.next_run_time.isoformat()
-
-        return TaskResponse(
-            id=task_dict["id"],
-            name=task_dict["name"],
-            description=task_dict["description"],
-            task_type=task_dict["task_type"],
-            schedule=task_dict["schedule"],
-            enabled=bool(task_dict["enabled"]),
-            max_retries=task_dict["max_retries"],
-            last_run=last_run,
-            next_run=next_run
-        )
+        return await _build_task_response(db, dict(task))
 
 
 @app.patch("/api/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(task_id: str, request: TaskUpdateRequest):
     """Update a task's schedule or enabled status."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
 
         # Check task exists
@@ -6531,39 +6979,31 @@ async def update_task(task_id: str, request: TaskUpdateRequest):
                 if scheduler.get_job(task_id):
                     scheduler.remove_job(task_id)
 
-                if task_dict["enabled"]:
+                if task_dict["enabled"] and task_id in TASK_REGISTRY:
                     try:
                         if task_dict["task_type"] == "interval":
-                            trigger_kwargs = parse_interval_schedule(task_dict["schedule"])
-                            trigger = IntervalTrigger(**trigger_kwargs)
+                            trigger = _build_interval_trigger(task_dict["schedule"])
                         else:
-                            parts = task_dict["schedule"].split()
-                            trigger = CronTrigger(
-                                minute=parts[0],
-                                hour=parts[1],
-                                day=parts[2],
-                                month=parts[3],
-                                day_of_week=parts[4]
-                            )
+                            trigger = _build_cron_trigger(task_dict["schedule"])
 
                         scheduler.add_job(
                             execute_task,
                             trigger=trigger,
-                            args=[task_id],
+                            args=[task_id, TASK_REGISTRY[task_id]],
                             id=task_id,
                             replace_existing=True
                         )
                     except Exception as e:
                         raise HTTPException(status_code=400, detail=f"Invalid schedule: {e}")
 
-    # Return updated task
-    return await get_task(task_id)
+        # Return updated task (task_dict already reflects the update)
+        return await _build_task_response(db, task_dict)
 
 
 @app.post("/api/tasks/{task_id}/trigger")
 async def trigger_task(task_id: str):
     """Manually trigger a task to run immediately."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "SELECT id FROM scheduled_tasks WHERE id = ?",
             (task_id,)
@@ -6575,7 +7015,7 @@ async def trigger_task(task_id: str):
         raise HTTPException(status_code=400, detail="Task has no implementation")
 
     # Run the task asynchronously
-    asyncio.create_task(execute_task(task_id))
+    asyncio.create_task(execute_task(task_id, TASK_REGISTRY[task_id]))
 
     return {"status": "triggered", "task_id": task_id}
 
@@ -6583,7 +7023,7 @@ async def trigger_task(task_id: str):
 @app.get("/api/tasks/{task_id}/history", response_model=List[TaskExecutionResponse])
 async def get_task_history(task_id: str, limit: int = 20):
     """Get execution history for a task."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
 
         # Check task exists
@@ -6595,33 +7035,34 @@ async def get_task_history(task_id: str, limit: int = 20):
             raise HTTPException(status_code=404, detail="Task not found")
 
         cursor = await db.execute(
-            """SELECT * FROM task_executions
+            """SELECT id, task_id, status, started_at, completed_at, duration_ms, result, retry_count
+               FROM task_executions
                WHERE task_id = ?
                ORDER BY started_at DESC
                LIMIT ?""",
             (task_id, limit)
         )
-        rows = await cursor.fetchall()
 
+        # Iterate the cursor (fetched in chunks) rather than materializing
+        # fetchall() plus a dict copy per row before building responses
         result = []
-        for row in rows:
-            row_dict = dict(row)
+        async for row in cursor:
             result_data = None
-            if row_dict["result"]:
+            if row["result"]:
                 try:
-                    result_data = json.loads(row_dict["result"])
+                    result_data = orjson.loads(row["result"])
                 except:
-                    result_data = {"raw": row_dict["result"]}
+                    result_data = {"raw": row["result"]}
 
             result.append(TaskExecutionResponse(
-                id=row_dict["id"],
-                task_id=row_dict["task_id"],
-                status=row_dict["status"],
-                started_at=row_dict["started_at"],
-                completed_at=row_dict["completed_at"],
-                duration_ms=row_dict["duration_ms"],
+                id=row["id"],
+                task_id=row["task_id"],
+                status=row["status"],
+                started_at=row["started_at"],
+                completed_at=row["completed_at"],
+                duration_ms=row["duration_ms"],
                 result=result_data,
-                retry_count=row_dict["retry_count"]
+                retry_count=row["retry_count"]
             ))
 
         return result
@@ -6817,7 +7258,7 @@ async def get_heartbeat_status():
     # Parse state file
     last_task = None
     try:
-        state = json.loads(HEARTBEAT_STATE_PATH.read_text())
+        state = await asyncio.to_thread(read_json_file_cached, HEARTBEAT_STATE_PATH)
         last_task = state.get("last_task_worked")
     except Exception:
         pass
@@ -6861,7 +7302,7 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _fast_ts().replace(" ", "T", 1),  # ISO 8601 form
         "tts_backend": {
             "current": TTS_BACKEND["current"],
             "satellite_available": TTS_BACKEND["satellite_available"],
@@ -6921,35 +7362,33 @@ SOUND_MAP = {
 }
 
 
-def play_sound(sound_file: str = None) -> dict:
+async def play_sound(sound_file: str = None) -> dict:
     """Play a notification sound using macOS afplay."""
     sound_name = sound_file or DEFAULT_SOUND
     sound_path = SOUND_MAP.get(sound_name, SOUND_MAP["chimes.wav"])
 
     try:
-        result = subprocess.run(
-            ["afplay", sound_path],
-            capture_output=True,
-            timeout=10
+        proc = await asyncio.create_subprocess_exec(
+            "afplay", sound_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-        if result.returncode == 0:
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=10)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return {"success": False, "error": "Sound playback timed out"}
+        if proc.returncode == 0:
             return {"success": True, "method": "afplay", "file": sound_path}
-        return {"success": False, "error": f"afplay failed: {result.stderr.decode()[:100]}"}
-    except subprocess.TimeoutExpired:
-        return {"success": False, "error": "Sound playback timed out"}
+        return {"success": False, "error": f"afplay failed: {stderr.decode()[:100]}"}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 async def log_event_sync(event_type: str, instance_id: str = None, device_id: str = None, details: dict = None):
     """Synchronous wrapper for logging events (for use in sync functions)."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """INSERT INTO events (event_type, instance_id, device_id, details)
-               VALUES (?, ?, ?, ?)""",
-            (event_type, instance_id, device_id, json.dumps(details) if details else None)
-        )
-        await db.commit()
+    await log_event(event_type, instance_id, device_id, details)
 
 
 def clean_markdown_for_tts(text: str) -> str:
@@ -7076,7 +7515,7 @@ def speak_tts_wsl(message: str, voice: str, rate: int = 0) -> dict:
     TTS_BACKEND["current"] = "wsl"
 
     try:
-        resp = requests.post(
+        resp = satellite_http.post(
             f"http://{host}:{port}/tts/speak",
             json={"message": message, "voice": voice, "rate": rate},
             timeout=300  # Long timeout — blocks until speech done
@@ -7146,32 +7585,38 @@ class TTSQueueItem:
     voice: str
     sound: str
     tab_name: str
-    queued_at: datetime = field(default_factory=datetime.now)
+    queued_at: float = field(default_factory=time.time)  # Epoch seconds; formatted only for the dashboard
     status: str = "queued"  # queued, playing, completed
+    preview: str = field(init=False, repr=False)  # Dashboard message excerpt
+
+    def __post_init__(self):
+        self.preview = self.message[:50] + "..." if len(self.message) > 50 else self.message
 
 # Global TTS queue state
-tts_queue: Deque[TTSQueueItem] = deque()
+TTS_QUEUE_MAX = 500  # queue_tts reports "queue full" rather than growing past this
+TTS_QUEUE_STATUS_LIMIT = 100  # Items rendered per get_tts_queue_status()
+tts_queue: asyncio.Queue[TTSQueueItem] = asyncio.Queue(maxsize=TTS_QUEUE_MAX)
 tts_current: Optional[TTSQueueItem] = None
 tts_current_process: Optional[subprocess.Popen] = None  # Current TTS/sound process for skip support
 tts_skip_requested: bool = False  # Flag to indicate skip was requested (vs. actual failure)
-tts_queue_lock = asyncio.Lock()
 tts_worker_task: Optional[asyncio.Task] = None
 stale_flag_cleaner_task: Optional[asyncio.Task] = None
 timer_worker_task: Optional[asyncio.Task] = None
+event_writer_task: Optional[asyncio.Task] = None
 
 
 async def tts_queue_worker():
-    """Background worker that processes TTS queue sequentially."""
+    """Background worker that processes TTS queue sequentially.
+
+    play_sound and speak_tts return when playback ends, so items never
+    overlap and no pause is inserted between them.
+    """
     global tts_current
 
     while True:
         try:
-            # Wait for items in queue
-            async with tts_queue_lock:
-                if tts_queue:
-                    tts_current = tts_queue.popleft()
-                else:
-                    tts_current = None
+            # Blocks until queue_tts puts an item
+            tts_current = await tts_queue.get()
 
             if tts_current:
                 # Log TTS starting
@@ -7185,17 +7630,23 @@ async def tts_queue_worker():
                     }
                 )
 
+                # Refresh the satellite health check while the sound plays, so
+                # speak_tts's backend choice doesn't add a round-trip after it
+                health_check = None
+                if tts_current.message:
+                    health_check = asyncio.create_task(asyncio.to_thread(is_satellite_tts_available))
+
                 # Play notification sound first (run in executor to not block event loop)
                 sound_result = None
                 if tts_current.sound:
-                    loop = asyncio.get_event_loop()
-                    sound_result = await loop.run_in_executor(None, play_sound, tts_current.sound)
-                    logger.info(f"TTS worker: sound result = {json.dumps(sound_result)}")
+                    sound_result = await play_sound(tts_current.sound)
+                    logger.info(f"TTS worker: sound result = {dumps_json(sound_result)}")
                     if not sound_result.get("success"):
                         logger.warning(f"Sound failed: {sound_result.get('error')}")
-                    await asyncio.sleep(0.3)  # Brief pause after sound
 
                 if tts_current.message:
+                    await health_check
+
                     # Look up profile by WSL voice (DB tts_voice stores WSL voice name)
                     # to get mac_voice fallback and wsl_rate
                     wsl_voice = tts_current.voice
@@ -7216,7 +7667,7 @@ async def tts_queue_worker():
                             0, tts_current.instance_id, wsl_voice, wsl_rate
                         )
                     )
-                    logger.info(f"TTS worker: speak result = {json.dumps(tts_result)}")
+                    logger.info(f"TTS worker: speak result = {dumps_json(tts_result)}")
 
                     # Log completion, skip, or failure
                     if tts_result.get("success"):
@@ -7255,10 +7706,6 @@ async def tts_queue_worker():
                     logger.info(f"TTS worker: muted mode, sound only for {tts_current.instance_id}")
 
                 tts_current = None
-                await asyncio.sleep(0.5)  # Brief pause between items
-            else:
-                # No items - wait a bit before checking again
-                await asyncio.sleep(0.1)
 
         except Exception as e:
             print(f"TTS worker error: {e}")
@@ -7318,8 +7765,8 @@ async def timer_worker():
                     _session_start_ms = now_ms
                     _mode_change_count += 1
                     # Enforce: close distraction windows + Pavlok
-                    close_distraction_windows()
-                    send_pavlok_stimulus(reason="distraction_timeout")
+                    await close_distraction_windows()
+                    await asyncio.to_thread(send_pavlok_stimulus, reason="distraction_timeout")
                     loop = asyncio.get_event_loop()
                     loop.run_in_executor(None, speak_tts, "Distraction timeout. Close distractions now.")
                     continue
@@ -7359,7 +7806,7 @@ async def timer_worker():
                     _mode_change_count += 1
                     _current_session_id = await timer_start_session(timer_engine.current_mode.value, today)
                     _session_start_ms = now_ms
-                    async with aiosqlite.connect(DB_PATH) as _wdb:
+                    async with db_connection() as _wdb:
                         _cur = await _wdb.execute(
                             "SELECT COUNT(*) FROM claude_instances WHERE status IN ('processing', 'idle') AND COALESCE(is_subagent, 0) = 0"
                         )
@@ -7427,7 +7874,7 @@ async def timer_worker():
             # Productivity layer update (every 10s) — poll DB for active instances
             if now - last_db_save >= 10:  # piggyback on DB save interval
                 any_processing = False
-                async with aiosqlite.connect(DB_PATH) as db:
+                async with db_connection() as db:
                     cursor = await db.execute(
                         """SELECT COUNT(*) FROM claude_instances
                            WHERE status = 'processing'
@@ -7482,14 +7929,14 @@ async def _async_enforce_twitter_timeout():
     now_ms = int(time.monotonic() * 1000)
 
     # Send notification sound + TTS
-    play_sound()
+    await play_sound()
     try:
         subprocess.Popen(["say", "-v", "Daniel", "Twitter open for 7 minutes. Forcing break."])
     except Exception:
         pass
 
     # Send low-intensity Pavlok zap
-    send_pavlok_stimulus(stimulus_type="zap", value=30, reason="twitter_timeout")
+    await asyncio.to_thread(send_pavlok_stimulus, stimulus_type="zap", value=30, reason="twitter_timeout")
 
     # Force timer into BREAK mode (clear any existing manual mode first)
     old_mode = timer_engine.current_mode.value
@@ -7517,7 +7964,7 @@ async def enforce_break_exhausted_impl() -> dict:
     desktop_result = None
 
     # Desktop enforcement: close distraction windows
-    desktop_result = close_distraction_windows()
+    desktop_result = await close_distraction_windows()
     if desktop_result.get("closed_count"):
         enforced_any = True
         print(f"BREAK-EXHAUSTED: Closed {desktop_result['closed_count']} desktop distraction windows")
@@ -7550,7 +7997,7 @@ async def enforce_break_exhausted_impl() -> dict:
         timer_engine.set_activity(Activity.WORKING, is_scrolling_gaming=False, now_mono_ms=now_ms)
 
     if enforced_any:
-        send_pavlok_stimulus(reason="break_exhausted")
+        await asyncio.to_thread(send_pavlok_stimulus, reason="break_exhausted")
 
     return {
         "enforced": enforced_any,
@@ -7560,23 +8007,88 @@ async def enforce_break_exhausted_impl() -> dict:
     }
 
 
+# instance_id -> time.monotonic() at which a 'processing' instance goes stale.
+# Every in-process flip to 'processing' calls mark_processing(), so
+# clear_stale_processing_flags sleeps until the earliest deadline instead of
+# polling; writers it doesn't see are caught when their deadline is re-read.
+STALE_PROCESSING_SECONDS = 300
+PROCESSING_DEADLINES: dict[str, float] = {}
+processing_deadlines_changed = asyncio.Event()
+
+
+def mark_processing(instance_id: str):
+    """Record that an instance just became (or stayed) 'processing'."""
+    if not PROCESSING_DEADLINES:
+        processing_deadlines_changed.set()
+    PROCESSING_DEADLINES[instance_id] = time.monotonic() + STALE_PROCESSING_SECONDS
+
+
+async def _load_processing_deadlines(db, instance_ids: Optional[list] = None):
+    """(Re)schedule deadlines from last_activity for 'processing' rows.
+
+    Deadlines land at least a second out, so a row whose last_activity is
+    right on the boundary can't make the worker re-query in a tight loop.
+    """
+    query = "SELECT id, last_activity FROM claude_instances WHERE status = 'processing'"
+    params: tuple = ()
+    if instance_ids is not None:
+        query += f" AND id IN ({','.join('?' * len(instance_ids))})"
+        params = tuple(instance_ids)
+    cursor = await db.execute(query, params)
+    now = datetime.now()
+    async for instance_id, last_activity in cursor:
+        try:
+            idle_for = (now - datetime.fromisoformat(last_activity)).total_seconds()
+        except (TypeError, ValueError):
+            idle_for = 0
+        PROCESSING_DEADLINES[instance_id] = time.monotonic() + max(1, STALE_PROCESSING_SECONDS - idle_for)
+
+
 async def clear_stale_processing_flags():
     """Background worker that auto-clears status='processing' for instances inactive > 5 minutes."""
+    try:
+        async with db_connection() as db:
+            await _load_processing_deadlines(db)
+    except Exception as e:
+        logger.error(f"Error loading processing deadlines: {e}")
+
     while True:
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
-                cursor = await db.execute("""
+            if not PROCESSING_DEADLINES:
+                processing_deadlines_changed.clear()
+                await processing_deadlines_changed.wait()
+                continue
+
+            delay = min(PROCESSING_DEADLINES.values()) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            now = time.monotonic()
+            expired = [iid for iid, deadline in PROCESSING_DEADLINES.items() if deadline <= now]
+            for iid in expired:
+                del PROCESSING_DEADLINES[iid]
+
+            # julianday keeps fractional seconds (datetime() truncates them), so
+            # a row that expired on our clock also compares as expired here
+            cutoff = (datetime.now() - timedelta(seconds=STALE_PROCESSING_SECONDS)).isoformat()
+            placeholders = ",".join("?" * len(expired))
+            async with db_connection() as db:
+                cursor = await db.execute(f"""
                     UPDATE claude_instances
                     SET status = 'idle'
-                    WHERE status = 'processing'
-                      AND datetime(last_activity) < datetime('now', 'localtime', '-5 minutes')
-                """)
+                    WHERE id IN ({placeholders})
+                      AND status = 'processing'
+                      AND julianday(last_activity) <= julianday(?)
+                """, (*expired, cutoff))
                 await db.commit()
 
                 if cursor.rowcount > 0:
                     logger.warning(f"Auto-cleared {cursor.rowcount} stale processing flags")
 
-            await asyncio.sleep(60)  # Run every minute
+                # Rows still processing had activity we didn't see; re-arm them
+                if cursor.rowcount < len(expired):
+                    await _load_processing_deadlines(db, expired)
 
         except Exception as e:
             logger.error(f"Error clearing stale flags: {e}")
@@ -7597,7 +8109,7 @@ async def detect_stuck_instances():
 
     while True:
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with db_connection() as db:
                 db.row_factory = aiosqlite.Row
                 cursor = await db.execute("""
                     SELECT id, tab_name, working_dir, pid, status, device_id, last_activity
@@ -7738,23 +8250,27 @@ async def queue_tts(instance_id: str, message: str) -> dict:
         return {"success": True, "queued": False, "reason": "in_meeting"}
 
     # Look up instance to get their profile
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT tab_name, tts_voice, notification_sound, tts_mode FROM claude_instances WHERE id = ?",
-            (instance_id,)
-        )
-        row = await cursor.fetchone()
-
-    if not row:
-        return {"success": False, "error": f"Instance {instance_id} not found"}
+    cached = INSTANCE_PROFILE_CACHE.get(instance_id)
+    if cached and time.monotonic() - cached[0] < INSTANCE_PROFILE_TTL:
+        row = cached[1]
+    else:
+        async with db_connection() as db:
+            cursor = await db.execute(
+                "SELECT tab_name, tts_voice, notification_sound, tts_mode FROM claude_instances WHERE id = ?",
+                (instance_id,)
+            )
+            row = await cursor.fetchone()
+        if not row:
+            return {"success": False, "error": f"Instance {instance_id} not found"}
+        INSTANCE_PROFILE_CACHE[instance_id] = (time.monotonic(), row)
 
-    voice = row["tts_voice"] or "Microsoft David"
-    sound = row["notification_sound"] or "chimes.wav"
-    tab_name = row["tab_name"] or instance_id
+    row_tab_name, row_voice, row_sound, row_mode = row
+    voice = row_voice or "Microsoft David"
+    sound = row_sound or "chimes.wav"
+    tab_name = row_tab_name or instance_id
 
     # Check TTS mode (per-instance and global, most restrictive wins)
-    instance_mode = row["tts_mode"] or "verbose"
+    instance_mode = row_mode or "verbose"
     # voice-chat behaves like verbose for TTS purposes
     if instance_mode == "voice-chat":
         instance_mode = "verbose"
@@ -7785,9 +8301,12 @@ async def queue_tts(instance_id: str, message: str) -> dict:
             tab_name=tab_name
         )
 
-    async with tts_queue_lock:
-        tts_queue.append(item)
-        position = len(tts_queue)
+    try:
+        await asyncio.wait_for(tts_queue.put(item), timeout=1.0)
+    except asyncio.TimeoutError:
+        logger.warning(f"TTS queue full ({TTS_QUEUE_MAX}), dropping: {message[:80]}")
+        return {"success": False, "error": "queue full"}
+    position = tts_queue.qsize()
 
     # Log queued event
     await log_event(
@@ -7812,13 +8331,14 @@ async def queue_tts(instance_id: str, message: str) -> dict:
 def get_tts_queue_status() -> dict:
     """Get current TTS queue status for dashboard."""
     queue_list = []
-    for item in tts_queue:
+    # No await below, so the worker can't pop mid-iteration
+    for item in itertools.islice(tts_queue._queue, TTS_QUEUE_STATUS_LIMIT):
         queue_list.append({
             "instance_id": item.instance_id,
             "tab_name": item.tab_name,
-            "message": item.message[:50] + "..." if len(item.message) > 50 else item.message,
+            "message": item.preview,
             "voice": item.voice,
-            "queued_at": item.queued_at.isoformat()
+            "queued_at": datetime.fromtimestamp(item.queued_at).isoformat()
         })
 
     current = None
@@ -7826,14 +8346,15 @@ def get_tts_queue_status() -> dict:
         current = {
             "instance_id": tts_current.instance_id,
             "tab_name": tts_current.tab_name,
-            "message": tts_current.message[:50] + "..." if len(tts_current.message) > 50 else tts_current.message,
+            "message": tts_current.preview,
             "voice": tts_current.voice
         }
 
     return {
         "current": current,
         "queue": queue_list,
-        "queue_length": len(queue_list),
+        "queue_length": tts_queue.qsize(),
+        "truncated": tts_queue.qsize() > len(queue_list),
         "backend": TTS_BACKEND["current"],
         "satellite_available": TTS_BACKEND["satellite_available"],
         "global_mode": TTS_GLOBAL_MODE["mode"],
@@ -7865,7 +8386,7 @@ async def skip_tts(clear_queue: bool = False) -> dict:
         host = DESKTOP_CONFIG["host"]
         port = DESKTOP_CONFIG["port"]
         try:
-            resp = requests.post(f"http://{host}:{port}/tts/skip", timeout=3)
+            resp = await asyncio.to_thread(satellite_http.post, f"http://{host}:{port}/tts/skip", timeout=3)
             result["skipped"] = resp.status_code == 200
             logger.info(f"TTS skip routed to WSL satellite: {resp.status_code}")
         except Exception as e:
@@ -7888,16 +8409,22 @@ async def skip_tts(clear_queue: bool = False) -> dict:
 
     # Clear queue if requested
     if clear_queue:
-        async with tts_queue_lock:
-            result["cleared"] = len(tts_queue)
-            tts_queue.clear()
-            if result["cleared"] > 0:
-                logger.info(f"Cleared {result['cleared']} items from TTS queue")
+        while not tts_queue.empty():
+            tts_queue.get_nowait()
+            result["cleared"] += 1
+        if result["cleared"] > 0:
+            logger.info(f"Cleared {result['cleared']} items from TTS queue")
 
     return result
 
 
-def send_webhook(webhook_url: str, message: str, data: dict = None) -> dict:
+# Keep-alive client for send_webhook, opened in lifespan (a transient client is
+# used outside it, e.g. in tests)
+WEBHOOK_TIMEOUT = httpx.Timeout(10, connect=5)
+webhook_http: Optional[httpx.AsyncClient] = None
+
+
+async def send_webhook(webhook_url: str, message: str, data: dict = None) -> dict:
     """Send notification via HTTP webhook.
 
     Sends message as query parameter (for MacroDroid {http_query_string})
@@ -7914,26 +8441,23 @@ def send_webhook(webhook_url: str, message: str, data: dict = None) -> dict:
     separator = "&" if "?" in webhook_url else "?"
     url_with_params = f"{webhook_url}{separator}message={quote(message)}"
 
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    headers = {"Content-Type": "application/json"}
     try:
-        result = subprocess.run(
-            [
-                "curl", "-X", "POST",
-                "-H", "Content-Type: application/json",
-                "-d", json.dumps(payload),
-                "--connect-timeout", "5",
-                "-s",
-                url_with_params
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        if result.returncode == 0:
-            return {"success": True, "method": "webhook", "url": webhook_url}
-        return {"success": False, "error": f"Webhook failed: {result.stderr}"}
+        if webhook_http is not None:
+            await webhook_http.post(url_with_params, content=body, headers=headers)
+        else:
+            async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT) as client:
+                await client.post(url_with_params, content=body, headers=headers)
+        return {"success": True, "method": "webhook", "url": webhook_url}
     except Exception as e:
-        return {"success": False, "error": str(e)}
+        return {"success": False, "error": f"Webhook failed: {e}"}
+
+
+# /api/notify's devices-row lookup. Device rows are only seeded by init_db and
+# edited outside the API, so a TTL is the only invalidation needed.
+DEVICE_CONFIG_TTL = 60.0  # seconds
+DEVICE_CONFIG_CACHE: dict[str, tuple[float, dict]] = {}
 
 
 @app.post("/api/notify")
@@ -7946,7 +8470,7 @@ async def send_notification(request: NotifyRequest):
 
     if not device_id and request.instance_id:
         # Look up instance to get device
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with db_connection() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute(
                 "SELECT device_id FROM claude_instances WHERE id = ?",
@@ -7960,18 +8484,23 @@ async def send_notification(request: NotifyRequest):
         device_id = "Mac-Mini"  # Default
 
     # Get device config
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT * FROM devices WHERE id = ?",
-            (device_id,)
-        )
-        device = await cursor.fetchone()
+    cached = DEVICE_CONFIG_CACHE.get(device_id)
+    if cached and time.monotonic() - cached[0] < DEVICE_CONFIG_TTL:
+        device = cached[1]
+    else:
+        async with db_connection() as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT * FROM devices WHERE id = ?",
+                (device_id,)
+            )
+            device = await cursor.fetchone()
 
-    if not device:
-        raise HTTPException(status_code=404, detail=f"Device not found: {device_id}")
+        if not device:
+            raise HTTPException(status_code=404, detail=f"Device not found: {device_id}")
 
-    device = dict(device)
+        device = dict(device)
+        DEVICE_CONFIG_CACHE[device_id] = (time.monotonic(), device)
     method = device.get("notification_method", "tts_sound")
 
     if method == "tts_sound":
@@ -7988,13 +8517,13 @@ async def send_notification(request: NotifyRequest):
                 device_id=device_id,
                 details={"message": request.message[:100], "voice": request.voice or "default"}
             )
-            results["sound"] = play_sound(request.sound)
-            results["tts"] = speak_tts(request.message, request.voice)
+            results["sound"] = await play_sound(request.sound)
+            results["tts"] = await asyncio.to_thread(speak_tts, request.message, request.voice)
     elif method == "webhook":
         # Mobile: send webhook
         webhook_url = device.get("webhook_url")
         if webhook_url:
-            results["webhook"] = send_webhook(webhook_url, request.message)
+            results["webhook"] = await send_webhook(webhook_url, request.message)
         else:
             results["webhook"] = {"success": False, "error": "No webhook_url configured"}
 
@@ -8028,7 +8557,7 @@ async def notify_tts(request: TTSRequest):
     wsl_voice = None
     wsl_rate = None
     if request.instance_id and not request.voice:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with db_connection() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute(
                 "SELECT tts_voice FROM claude_instances WHERE id = ?",
@@ -8077,7 +8606,7 @@ async def notify_sound(request: SoundRequest):
         logger.info(f"Sound suppressed (quiet hours): {request.sound_file}")
         return {"success": True, "suppressed": True, "reason": "quiet_hours"}
 
-    result = play_sound(request.sound_file)
+    result = await play_sound(request.sound_file)
 
     await log_event(
         "sound_played",
@@ -8087,7 +8616,7 @@ async def notify_sound(request: SoundRequest):
     return result
 
 
-class QueueTTSRequest(BaseModel):
+class QueueTTSRequest(FastModel):
     instance_id: str
     message: str
 
@@ -8135,7 +8664,7 @@ async def set_global_tts_mode(request: Request):
     TTS_GLOBAL_MODE["mode"] = mode
 
     # Update all active instances to match
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         if mode == "silent":
             # Release all voice slots for non-subagent active instances
             await db.execute(
@@ -8163,6 +8692,7 @@ async def set_global_tts_mode(request: Request):
                 (mode,)
             )
         await db.commit()
+    invalidate_instance_profile()
 
     await log_event("tts_global_mode_changed", details={"mode": mode, "old_mode": old_mode})
     return {"status": "ok", "mode": mode, "old_mode": old_mode}
@@ -8171,8 +8701,8 @@ async def set_global_tts_mode(request: Request):
 @app.get("/api/notify/test")
 async def test_notification():
     """Test the notification system with a simple message."""
-    sound_result = play_sound()
-    tts_result = speak_tts("Token API notification test")
+    sound_result = await play_sound()
+    tts_result = await asyncio.to_thread(speak_tts, "Token API notification test")
 
     return {
         "sound": sound_result,
@@ -8217,7 +8747,7 @@ async def handle_session_start(payload: dict) -> dict:
     # Resolve device_id from source_ip
     device_id = resolve_device_from_ip(source_ip) if source_ip else "Mac-Mini"
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Check if already registered
         cursor = await db.execute(
             "SELECT id FROM claude_instances WHERE id = ?",
@@ -8233,12 +8763,11 @@ async def handle_session_start(payload: dict) -> dict:
         else:
             # Get WSL voices held by active instances
             cursor = await db.execute(
-                "SELECT tts_voice FROM claude_instances WHERE status IN ('processing', 'idle')"
+                "SELECT tts_voice FROM claude_instances WHERE status IN ('processing', 'idle') AND tts_voice IS NOT NULL"
             )
-            rows = await cursor.fetchall()
-            used_wsl_voices = {row[0] for row in rows if row[0]}
+            used_wsl_voices = {row[0] for row in await cursor.fetchall()}
 
-            # Assign profile via linear probe
+            # Assign profile from the free pool
             profile, pool_exhausted = get_next_available_profile(used_wsl_voices)
 
         # Insert instance
@@ -8286,6 +8815,8 @@ async def handle_session_start(payload: dict) -> dict:
                 )
 
         await db.commit()
+        invalidate_active_count()
+        invalidate_instance_profile(session_id)
 
         # Update frontmatter if we linked a session doc
         if session_doc_id:
@@ -8313,10 +8844,11 @@ async def handle_session_end(payload: dict) -> dict:
         return {"success": False, "action": "no_session_id"}
 
     _pending_background_tasks.pop(session_id, None)
+    _post_tool_debounce.pop(session_id, None)
 
     now = datetime.now().isoformat()
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "SELECT id, device_id, COALESCE(is_subagent, 0), session_doc_id FROM claude_instances WHERE id = ?",
             (session_id,)
@@ -8341,6 +8873,7 @@ async def handle_session_end(payload: dict) -> dict:
             (now, session_id)
         )
         await db.commit()
+        invalidate_active_count()
 
         # Check remaining active instances
         cursor = await db.execute(
@@ -8382,7 +8915,7 @@ async def handle_session_end(payload: dict) -> dict:
     # Handle productivity enforcement if needed
     result = {"success": True, "action": "stopped", "instance_id": session_id}
     if remaining_active == 0 and DESKTOP_STATE.get("current_mode") == "video":
-        enforce_result = close_distraction_windows()
+        enforce_result = await close_distraction_windows()
         result["enforcement_triggered"] = True
         result["enforcement_result"] = enforce_result
 
@@ -8400,28 +8933,25 @@ async def handle_prompt_submit(payload: dict) -> dict:
         _pending_background_tasks[session_id] -= 1
         if _pending_background_tasks[session_id] <= 0:
             del _pending_background_tasks[session_id]
-        logger.info(f"PromptSubmit: background task returned for {session_id[:12]} (pending: {_pending_background_tasks.get(session_id, 0)})")
+        logger.info(f"PromptSubmit: background task returned for {session_id[:12]} (pending: {_pending_background_tasks[session_id]})")
 
     now = datetime.now().isoformat()
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT id FROM claude_instances WHERE id = ?",
-            (session_id,)
-        )
-        if not await cursor.fetchone():
-            return {"success": False, "action": "not_found"}
-
+    async with db_connection() as db:
         # Also resurrect stopped instances - activity means they're active
         # Backfill PID if payload contains one and DB value is NULL
-        await db.execute(
+        cursor = await db.execute(
             """UPDATE claude_instances
                SET status = 'processing', last_activity = ?, stopped_at = NULL,
                    pid = COALESCE(pid, ?)
                WHERE id = ?""",
             (now, payload.get("pid"), session_id)
         )
+        if cursor.rowcount == 0:
+            return {"success": False, "action": "not_found"}
         await db.commit()
+        invalidate_active_count()
+    mark_processing(session_id)
 
     # Signal productivity — sets prod active, exits IDLE if needed
     now_ms = int(time.monotonic() * 1000)
@@ -8456,7 +8986,7 @@ async def handle_post_tool_use(payload: dict) -> dict:
     # Also resurrect stopped instances - activity means they're active
     # Backfill PID if payload contains one and DB value is NULL
     now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute(
             """UPDATE claude_instances
                SET status = 'processing', last_activity = ?, stopped_at = NULL,
@@ -8465,6 +8995,8 @@ async def handle_post_tool_use(payload: dict) -> dict:
             (now, payload.get("pid"), session_id)
         )
         await db.commit()
+        invalidate_active_count()
+    mark_processing(session_id)
 
     # Signal productivity — active tool use = real work
     now_ms = int(time.monotonic() * 1000)
@@ -8505,12 +9037,21 @@ def _parse_assistant_turn_from_lines(lines: list) -> Optional[dict]:
     return None
 
 
-def _extract_last_assistant_turn(transcript_path: str, max_retries: int = 8, retry_delay: float = 0.25) -> Optional[dict]:
-    """Extract last assistant turn from a transcript file, polling briefly for flush."""
+def _read_transcript_lines(transcript_path: str) -> list:
+    """Read all lines of a transcript file (sync, for thread offload)."""
+    with open(transcript_path, "r") as f:
+        return f.readlines()
+
+
+async def _extract_last_assistant_turn(transcript_path: str, max_retries: int = 8, retry_delay: float = 0.25) -> Optional[dict]:
+    """Extract last assistant turn from a transcript file, polling briefly for flush.
+
+    Reads run in a worker thread and the retry delay is an asyncio sleep, so
+    the up-to-2s poll doesn't stall other requests.
+    """
     for attempt in range(max_retries):
         try:
-            with open(transcript_path, "r") as f:
-                lines = f.readlines()
+            lines = await asyncio.to_thread(_read_transcript_lines, transcript_path)
         except OSError:
             return None
 
@@ -8519,7 +9060,7 @@ def _extract_last_assistant_turn(transcript_path: str, max_retries: int = 8, ret
             return result
 
         if attempt < max_retries - 1:
-            time.sleep(retry_delay)
+            await asyncio.sleep(retry_delay)
 
     return None
 
@@ -8603,7 +9144,7 @@ async def handle_stop_validate(payload: dict) -> dict:
         return {}
 
     # Intermediate stop: background subagents still pending for this session.
-    if _pending_background_tasks.get(session_id, 0) > 0:
+    if _pending_background_tasks[session_id] > 0:
         logger.info(f"{log_prefix} ALLOW: intermediate stop ({_pending_background_tasks[session_id]} background tasks pending)")
         return {}
 
@@ -8620,7 +9161,7 @@ async def handle_stop_validate(payload: dict) -> dict:
     if transcript_tail:
         turn = _parse_assistant_turn_from_lines(transcript_tail.splitlines())
     elif transcript_path and os.path.exists(transcript_path):
-        turn = _extract_last_assistant_turn(transcript_path)
+        turn = await _extract_last_assistant_turn(transcript_path)
     else:
         logger.info(f"{log_prefix} ALLOW: no transcript")
         return {}
@@ -8672,7 +9213,7 @@ async def handle_stop(payload: dict) -> dict:
         return {"success": True, "action": "skipped_recursive"}
 
     # Get instance info
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM claude_instances WHERE id = ?",
@@ -8691,12 +9232,13 @@ async def handle_stop(payload: dict) -> dict:
 
     # Mark as no longer processing
     now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await db.execute(
             "UPDATE claude_instances SET status = 'idle', last_activity = ? WHERE id = ?",
             (now, session_id)
         )
         await db.commit()
+        invalidate_active_count()
 
     # Fire session doc swarm if instance has a linked doc
     session_doc_id = instance.get("session_doc_id")
@@ -8724,7 +9266,7 @@ async def handle_stop(payload: dict) -> dict:
         return result
 
     # Intermediate stop: background subagents still pending. Update state but skip notifications.
-    if _pending_background_tasks.get(session_id, 0) > 0:
+    if _pending_background_tasks[session_id] > 0:
         result["action"] = "stop_processed_intermediate"
         logger.info(f"Hook: Stop {session_id[:12]}... intermediate ({_pending_background_tasks[session_id]} background tasks pending) — skipping notifications")
         return result
@@ -8793,7 +9335,7 @@ async def handle_stop(payload: dict) -> dict:
             notify_text = f"[{tab_name}] {tts_text[:300]}"
         else:
             notify_text = f"[{tab_name}] Claude finished"
-        webhook_result = send_webhook(
+        webhook_result = await send_webhook(
             "http://100.102.92.24:7777/notify",
             notify_text
         )
@@ -8808,9 +9350,8 @@ async def handle_stop(payload: dict) -> dict:
 
     if tts_config_file.exists():
         try:
-            with open(tts_config_file) as f:
-                config = json.load(f)
-                tts_enabled = config.get("enabled", True)
+            config = read_json_file_cached(tts_config_file)
+            tts_enabled = config.get("enabled", True)
         except Exception:
             pass
 
@@ -8818,17 +9359,18 @@ async def handle_stop(payload: dict) -> dict:
     if tts_enabled and tts_text:
         logger.info(f"Hook: Stop queuing TTS, {len(tts_text)} chars: {tts_text[:80]}...")
         tts_result = await queue_tts(session_id, tts_text)
-        logger.info(f"Hook: Stop queue_tts result: {json.dumps(tts_result)}")
+        logger.info(f"Hook: Stop queue_tts result: {dumps_json(tts_result)}")
         result["tts"] = tts_result
     else:
         # Just play notification sound without TTS
         logger.info(f"Hook: Stop no TTS text (tts_enabled={tts_enabled}, has_text={bool(tts_text)})")
-        play_sound(notification_sound)
+        await play_sound(notification_sound)
         result["sound"] = {"played": notification_sound}
 
     # Pavlok vibe notification (skip for subagents)
     if not instance.get("is_subagent"):
-        vibe_result = send_pavlok_stimulus(
+        vibe_result = await asyncio.to_thread(
+            send_pavlok_stimulus,
             stimulus_type="vibe",
             value=30,
             reason="claude_finished",
@@ -8852,7 +9394,7 @@ async def handle_pre_tool_use(payload: dict) -> dict:
     # Also resurrect stopped instances - activity means they're active
     if session_id:
         now = datetime.now().isoformat()
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with db_connection() as db:
             await db.execute(
                 """UPDATE claude_instances
                    SET status = 'processing', last_activity = ?, stopped_at = NULL
@@ -8860,10 +9402,12 @@ async def handle_pre_tool_use(payload: dict) -> dict:
                 (now, session_id)
             )
             await db.commit()
+            invalidate_active_count()
+        mark_processing(session_id)
 
     # Track background Task subagents so Stop hooks can detect intermediate vs final stops.
     if tool_name == "Task" and tool_input.get("run_in_background"):
-        _pending_background_tasks[session_id] = _pending_background_tasks.get(session_id, 0) + 1
+        _pending_background_tasks[session_id] += 1
         logger.info(f"PreToolUse: Task background launched for {session_id[:12]} (pending: {_pending_background_tasks[session_id]})")
         return {"success": True, "action": "allowed"}
 
@@ -8935,7 +9479,7 @@ async def handle_notification(payload: dict) -> dict:
     sound_file = "chimes.wav"  # default
 
     if session_id:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with db_connection() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute(
                 "SELECT notification_sound FROM claude_instances WHERE id = ?",
@@ -8945,7 +9489,7 @@ async def handle_notification(payload: dict) -> dict:
             if row and row["notification_sound"]:
                 sound_file = row["notification_sound"]
 
-    result = play_sound(sound_file)
+    result = await play_sound(sound_file)
     return {"success": True, "action": "sound_played", "sound": sound_file, "result": result}
 
 
@@ -10214,7 +10758,7 @@ async def inbox_trials_check():
     return results
 
 
-class InboxImplantRequest(BaseModel):
+class InboxImplantRequest(FastModel):
     """Manual trigger for implantation on an existing inbox note."""
     path: str
     skip_trials: bool = False
@@ -10352,7 +10896,7 @@ SESSION_SWARM_ROLES = {
 async def fire_session_doc_swarm(session_doc_id: int, instance_tab_name: str, context: str = "") -> None:
     """Fire Minimax agents to update session doc after a stop event."""
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with db_connection() as db:
             cursor = await db.execute("SELECT file_path FROM session_documents WHERE id = ?", (session_doc_id,))
             row = await cursor.fetchone()
             if not row:
@@ -10565,7 +11109,7 @@ async def _handle_orphan_doc(doc_id: int) -> None:
     - completed / deployment → leave alone (Administratum handles)
     - processed → archive
     """
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "SELECT COUNT(*) FROM claude_instances WHERE session_doc_id = ?",
             (doc_id,)
@@ -10635,7 +11179,7 @@ async def create_session_doc(request: SessionDocCreateRequest):
         raise HTTPException(status_code=409, detail=f"File already exists: {fp}")
 
     now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             """INSERT INTO session_documents (title, file_path, project, primarch_name, status, created_at, updated_at)
                VALUES (?, ?, ?, ?, 'active', ?, ?)""",
@@ -10672,7 +11216,7 @@ async def create_session_doc(request: SessionDocCreateRequest):
 @app.get("/api/session-docs")
 async def list_session_docs(status: Optional[str] = None, project: Optional[str] = None):
     """List session documents with optional filters."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         query = "SELECT * FROM session_documents WHERE 1=1"
         params = []
@@ -10705,7 +11249,7 @@ async def list_session_docs(status: Optional[str] = None, project: Optional[str]
 @app.get("/api/session-docs/deployment-queue")
 async def get_deployment_queue():
     """List session docs ready for Administratum processing."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM session_documents WHERE status = 'deployment' ORDER BY updated_at ASC"
@@ -10717,7 +11261,7 @@ async def get_deployment_queue():
 @app.get("/api/session-docs/{doc_id}")
 async def get_session_doc(doc_id: int):
     """Get session document metadata and linked instances."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("SELECT * FROM session_documents WHERE id = ?", (doc_id,))
         row = await cursor.fetchone()
@@ -10740,7 +11284,7 @@ async def get_session_doc(doc_id: int):
 @app.get("/api/session-docs/{doc_id}/content")
 async def get_session_doc_content(doc_id: int):
     """Read the actual markdown file content of a session document."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("SELECT file_path, title FROM session_documents WHERE id = ?", (doc_id,))
         row = await cursor.fetchone()
         if not row:
@@ -10756,7 +11300,7 @@ async def get_session_doc_content(doc_id: int):
 @app.patch("/api/session-docs/{doc_id}")
 async def update_session_doc(doc_id: int, request: SessionDocUpdateRequest):
     """Update session document metadata."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("SELECT id, status FROM session_documents WHERE id = ?", (doc_id,))
         row = await cursor.fetchone()
         if not row:
@@ -10802,7 +11346,7 @@ async def update_session_doc(doc_id: int, request: SessionDocUpdateRequest):
 @app.delete("/api/session-docs/{doc_id}")
 async def delete_session_doc(doc_id: int, hard: bool = False):
     """Delete a session document. Default is soft delete (archive). Use ?hard=true for hard delete."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("SELECT file_path, title FROM session_documents WHERE id = ?", (doc_id,))
         row = await cursor.fetchone()
         if not row:
@@ -10841,7 +11385,7 @@ async def delete_session_doc(doc_id: int, hard: bool = False):
 @app.post("/api/session-docs/{doc_id}/merge")
 async def merge_into_session_doc(doc_id: int, request: SessionDocMergeRequest):
     """Intelligently merge content into a session document using LLM."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("SELECT file_path, title FROM session_documents WHERE id = ?", (doc_id,))
         row = await cursor.fetchone()
         if not row:
@@ -10894,7 +11438,7 @@ Return the complete updated document."""
 
         fp.write_text(updated)
 
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with db_connection() as db:
             await db.execute(
                 "UPDATE session_documents SET updated_at = ? WHERE id = ?",
                 (datetime.now().isoformat(), doc_id)
@@ -10918,7 +11462,7 @@ Return the complete updated document."""
 @app.post("/api/instances/{instance_id}/assign-doc")
 async def assign_doc_to_instance(instance_id: str, doc_id: int):
     """Assign an existing session document to an instance."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Verify instance exists
         cursor = await db.execute("SELECT id, session_doc_id FROM claude_instances WHERE id = ?", (instance_id,))
         inst_row = await cursor.fetchone()
@@ -10955,7 +11499,7 @@ async def assign_doc_to_instance(instance_id: str, doc_id: int):
 @app.post("/api/instances/{instance_id}/create-doc")
 async def create_doc_for_instance(instance_id: str, request: SessionDocCreateRequest):
     """Create a new session document and assign it to the instance."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Verify instance exists
         cursor = await db.execute("SELECT id, session_doc_id FROM claude_instances WHERE id = ?", (instance_id,))
         inst_row = await cursor.fetchone()
@@ -10976,7 +11520,7 @@ async def create_doc_for_instance(instance_id: str, request: SessionDocCreateReq
     if fp.exists():
         raise HTTPException(status_code=409, detail=f"File already exists: {fp}")
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             """INSERT INTO session_documents (title, file_path, project, status, created_at, updated_at)
                VALUES (?, ?, ?, 'active', ?, ?)""",
@@ -11008,7 +11552,7 @@ async def create_doc_for_instance(instance_id: str, request: SessionDocCreateReq
 @app.delete("/api/instances/{instance_id}/unassign-doc")
 async def unassign_doc_from_instance(instance_id: str):
     """Unlink a session document from an instance."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("SELECT id, session_doc_id FROM claude_instances WHERE id = ?", (instance_id,))
         inst_row = await cursor.fetchone()
         if not inst_row:
@@ -11039,7 +11583,7 @@ async def unassign_doc_from_instance(instance_id: str):
 @app.get("/api/instances/{instance_id}/session-doc")
 async def get_instance_session_doc(instance_id: str):
     """Get the session document linked to this instance."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "SELECT session_doc_id FROM claude_instances WHERE id = ?",
             (instance_id,)
@@ -11067,7 +11611,7 @@ async def get_instance_session_doc(instance_id: str):
 async def list_primarchs():
     """List all primarchs from DB with their active session doc."""
     result = []
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         primarchs = await get_all_primarchs_from_db(db)
         for p in primarchs:
             # Get active doc link
@@ -11101,7 +11645,7 @@ async def list_primarchs():
 @app.get("/api/primarchs/{name}")
 async def get_primarch(name: str):
     """Get a single primarch by name or alias."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         p = await get_primarch_from_db(db, name)
         if not p:
             raise HTTPException(404, f"Unknown primarch: {name}")
@@ -11125,7 +11669,7 @@ async def get_primarch(name: str):
 @app.get("/api/primarchs/{name}/active-doc")
 async def get_primarch_active_doc(name: str):
     """Get the currently linked session doc for a primarch, or null."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Resolve alias to canonical name
         p = await get_primarch_from_db(db, name)
         if p:
@@ -11147,7 +11691,7 @@ async def get_primarch_active_doc(name: str):
         return {"primarch": name, "doc_id": link_row[0], "doc": dict(doc_row)}
 
 
-class PrimarchLinkDocRequest(BaseModel):
+class PrimarchLinkDocRequest(FastModel):
     title: Optional[str] = None
 
 
@@ -11156,7 +11700,7 @@ async def link_primarch_doc(name: str, doc_id: Optional[int] = None, request: Pr
     """Link a primarch to a session doc. If doc_id query param given, link existing. If body has title, create new + link."""
     now = datetime.now().isoformat()
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         if doc_id:
             # Link to existing doc
             cursor = await db.execute("SELECT id FROM session_documents WHERE id = ?", (doc_id,))
@@ -11206,7 +11750,7 @@ async def link_primarch_doc(name: str, doc_id: Optional[int] = None, request: Pr
 async def unlink_primarch_doc(name: str):
     """Unlink the current session doc from a primarch."""
     now = datetime.now().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "SELECT session_doc_id FROM primarch_session_docs WHERE primarch_name = ? AND unlinked_at IS NULL",
             (name,)
@@ -11236,7 +11780,7 @@ async def unlink_primarch_doc(name: str):
 @app.post("/api/session-docs/{doc_id}/deploy")
 async def deploy_session_doc(doc_id: int):
     """Transition a completed session doc to deployment status."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("SELECT id, status, title FROM session_documents WHERE id = ?", (doc_id,))
         row = await cursor.fetchone()
         if not row:
@@ -11259,7 +11803,7 @@ async def deploy_session_doc(doc_id: int):
 @app.post("/api/session-docs/{doc_id}/mark-processed")
 async def mark_session_doc_processed(doc_id: int):
     """Mark a deployment doc as processed by Administratum. Unlinks primarch if linked."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute("SELECT id, status, title, primarch_name FROM session_documents WHERE id = ?", (doc_id,))
         row = await cursor.fetchone()
         if not row:
@@ -11334,7 +11878,7 @@ async def _ensure_agent_state_table(db: aiosqlite.Connection):
 @app.get("/api/fleet/state")
 async def get_fleet_state():
     """Return current fleet state. Seeds from legacy file on first access."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await _ensure_agent_state_table(db)
         state = await _get_fleet_state_row(db)
         if state is None:
@@ -11359,7 +11903,7 @@ async def get_fleet_state():
 async def patch_fleet_state(request: Request):
     """Merge-patch update: only provided keys are updated, others preserved."""
     updates = await request.json()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await _ensure_agent_state_table(db)
         state = await _get_fleet_state_row(db)
         if state is None:
@@ -11378,7 +11922,7 @@ async def patch_fleet_state(request: Request):
 async def put_fleet_state(request: Request):
     """Full replacement of fleet state."""
     new_state = await request.json()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await _ensure_agent_state_table(db)
         now = datetime.now().isoformat()
         await db.execute(
@@ -11393,7 +11937,7 @@ async def put_fleet_state(request: Request):
 async def reset_fleet_state():
     """Reset fleet state to defaults."""
     state = dict(_FLEET_STATE_DEFAULTS)
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         await _ensure_agent_state_table(db)
         now = datetime.now().isoformat()
         await db.execute(
@@ -11409,7 +11953,7 @@ async def reset_fleet_state():
 @app.get("/api/habits/definitions")
 async def get_habit_definitions():
     """Return all active habit definitions with their windows."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT id, name, category, window_start_hour, window_end_hour, notes FROM habits WHERE active = 1 ORDER BY window_start_hour, category, id"
@@ -11422,7 +11966,7 @@ async def get_habit_definitions():
 async def get_habits_today():
     """Return today's habit completion state: definitions + which are checked off."""
     today = datetime.now().strftime("%Y-%m-%d")
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("""
             SELECT h.id, h.name, h.category, h.window_start_hour, h.window_end_hour, h.notes,
@@ -11463,7 +12007,7 @@ async def mark_habit_today(habit_id: str, body: dict = None):
     notes = body.get("notes")
     today = datetime.now().strftime("%Y-%m-%d")
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         # Verify habit exists
         cursor = await db.execute("SELECT id, name FROM habits WHERE id = ? AND active = 1", (habit_id,))
         habit = await cursor.fetchone()
@@ -11510,7 +12054,7 @@ async def get_state():
     timer_mode = timer_engine.current_mode.value
 
     # Instances
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with db_connection() as db:
         cursor = await db.execute(
             "SELECT COUNT(*) FROM claude_instances WHERE status = 'active'"
         )
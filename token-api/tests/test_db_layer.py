@@ -0,0 +1,428 @@
+"""Tests for the shared-connection database layer in main.py.
+
+Covers db_connection() / db_reader(), the batched event writer, the
+stale-processing deadline worker, the active-count and enforce caches, and
+the task-lock upsert. Each test runs against a fresh temp database with the
+shared connection opened the way the lifespan opens it.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import aiosqlite
+import pytest
+
+# main reads TOKEN_API_DB at import time; never let a test run point it at the
+# real database. main itself is imported lazily (see the fixture) so this
+# module doesn't pre-empt test_voice_pool's own TOKEN_API_DB.
+os.environ.setdefault("TOKEN_API_DB", tempfile.NamedTemporaryFile(suffix=".db", delete=False).name)
+
+
+# ── Helpers ───────────────────────────────────────────────────
+
+
+def run(coro):
+    """Run an async function in a fresh event loop."""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def m(tmp_path, monkeypatch):
+    """main, pointed at a temp DB with per-test loop-bound state."""
+    import main
+
+    db_path = tmp_path / "agents.db"
+    monkeypatch.setattr(main, "DB_PATH", db_path)
+    monkeypatch.setattr(main, "DB_PATH_STR", str(db_path))
+    # asyncio primitives bind to the first loop that waits on them
+    monkeypatch.setattr(main, "_shared_db_lock", asyncio.Lock())
+    monkeypatch.setattr(main, "processing_deadlines_changed", asyncio.Event())
+    monkeypatch.setattr(main, "EVENT_QUEUE", None)
+    monkeypatch.setattr(main, "PROCESSING_DEADLINES", {})
+    monkeypatch.setattr(main, "INSTANCE_STATE", {
+        "active_count": None, "counted_at": 0.0, "generation": 0,
+        "enforce_response": None, "enforce_at": 0.0,
+    })
+    return main
+
+
+def with_shared_db(m, body):
+    """Open the shared connection + reader pool, init the schema, run body(m)."""
+    async def _run():
+        await m.open_shared_db()
+        try:
+            await m.init_db()
+            return await body(m)
+        finally:
+            await m.close_shared_db()
+    return run(_run())
+
+
+async def insert_instance(db, instance_id: str, status: str = "processing", last_activity: str = None):
+    last_activity = last_activity or datetime.now().isoformat()
+    await db.execute(
+        """INSERT INTO claude_instances
+           (id, session_id, tab_name, origin_type, device_id, status, registered_at, last_activity)
+           VALUES (?, ?, ?, 'local', 'desktop', ?, ?, ?)""",
+        (instance_id, instance_id, instance_id, status, last_activity, last_activity),
+    )
+    await db.commit()
+
+
+async def count_rows(m, table: str) -> int:
+    async with m.db_connection() as db:
+        cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")
+        return (await cursor.fetchone())[0]
+
+
+# ── db_connection ─────────────────────────────────────────────
+
+
+class TestDbConnection:
+    def test_nested_use_in_same_task_reuses_connection(self, m):
+        async def body(m):
+            async with m.db_connection() as outer:
+                # Same task: would deadlock on _shared_db_lock if not re-entrant
+                async with m.db_connection() as inner:
+                    pass
+            return outer, inner
+
+        outer, inner = with_shared_db(m, body)
+        assert outer is inner
+
+    def test_other_tasks_wait_for_the_holder(self, m):
+        async def body(m):
+            order = []
+
+            async def holder():
+                async with m.db_connection():
+                    order.append("holder-in")
+                    await asyncio.sleep(0.05)
+                    order.append("holder-out")
+
+            async def waiter():
+                await asyncio.sleep(0.01)
+                async with m.db_connection():
+                    order.append("waiter-in")
+
+            await asyncio.gather(holder(), waiter())
+            return order
+
+        assert with_shared_db(m, body) == ["holder-in", "holder-out", "waiter-in"]
+
+    def test_uncommitted_work_is_rolled_back_on_exit(self, m):
+        async def body(m):
+            async with m.db_connection() as db:
+                await db.execute("DELETE FROM devices")
+                assert db.in_transaction
+            async with m.db_connection() as db:
+                assert not db.in_transaction
+            return await count_rows(m, "devices")
+
+        assert with_shared_db(m, body) == 2
+
+    def test_row_factory_does_not_leak(self, m):
+        async def body(m):
+            async with m.db_connection() as db:
+                db.row_factory = aiosqlite.Row
+                async with m.db_connection() as nested:
+                    nested.row_factory = None
+                # Nested exit restores the outer block's factory
+                assert db.row_factory is aiosqlite.Row
+            async with m.db_connection() as db:
+                return db.row_factory
+
+        assert with_shared_db(m, body) is None
+
+    def test_falls_back_to_short_lived_connection(self, m):
+        async def body():
+            await m.init_db()
+            async with m.db_connection() as db:
+                assert db is not m._shared_db
+                cursor = await db.execute("SELECT COUNT(*) FROM devices")
+                return (await cursor.fetchone())[0]
+
+        assert m._shared_db is None
+        assert run(body()) == 2
+
+
+# ── db_reader ─────────────────────────────────────────────────
+
+
+class TestDbReader:
+    def test_pooled_connections_are_read_only(self, m):
+        async def body(m):
+            async with m.db_reader() as db:
+                assert db is not m._shared_db
+                with pytest.raises(sqlite3.OperationalError):
+                    await db.execute("DELETE FROM devices")
+
+        with_shared_db(m, body)
+
+    def test_reads_proceed_while_writer_is_held(self, m):
+        async def body(m):
+            writer_held = asyncio.Event()
+            release = asyncio.Event()
+
+            async def writer():
+                async with m.db_connection():
+                    writer_held.set()
+                    await release.wait()
+
+            task = asyncio.create_task(writer())
+            await writer_held.wait()
+            try:
+                async def read():
+                    async with m.db_reader() as db:
+                        cursor = await db.execute("SELECT COUNT(*) FROM devices")
+                        return (await cursor.fetchone())[0]
+                return await asyncio.wait_for(read(), timeout=1)
+            finally:
+                release.set()
+                await task
+
+        assert with_shared_db(m, body) == 2
+
+    def test_concurrent_checkouts_get_distinct_connections(self, m):
+        async def body(m):
+            seen = []
+            barrier = asyncio.Event()
+
+            async def borrow():
+                async with m.db_reader() as db:
+                    seen.append(db)
+                    if len(seen) == m.DB_READER_COUNT:
+                        barrier.set()
+                    await barrier.wait()
+
+            await asyncio.wait_for(
+                asyncio.gather(*(borrow() for _ in range(m.DB_READER_COUNT))), timeout=1
+            )
+            return seen
+
+        seen = with_shared_db(m, body)
+        assert len({id(db) for db in seen}) == m.DB_READER_COUNT
+
+    def test_row_factory_reset_on_return(self, m):
+        async def body(m):
+            for _ in range(m.DB_READER_COUNT):
+                async with m.db_reader() as db:
+                    db.row_factory = aiosqlite.Row
+            async with m.db_reader() as db:
+                return db.row_factory
+
+        assert with_shared_db(m, body) is None
+
+    def test_falls_back_without_pool(self, m):
+        async def body():
+            await m.init_db()
+            async with m.db_reader() as db:
+                cursor = await db.execute("SELECT COUNT(*) FROM devices")
+                return (await cursor.fetchone())[0]
+
+        assert m._db_readers is None
+        assert run(body()) == 2
+
+
+# ── Event writes ──────────────────────────────────────────────
+
+
+class TestEventWrites:
+    def test_write_events_inserts_a_batch(self, m):
+        async def body(m):
+            await m.write_events([
+                ("a", "i1", "desktop", None),
+                ("b", None, None, '{"k": 1}'),
+                ("c", "i2", None, None),
+            ])
+            async with m.db_connection() as db:
+                cursor = await db.execute("SELECT event_type, details FROM events ORDER BY id")
+                return await cursor.fetchall()
+
+        assert with_shared_db(m, body) == [("a", None), ("b", '{"k": 1}'), ("c", None)]
+
+    def test_log_event_inside_open_transaction(self, m):
+        async def body(m):
+            async with m.db_connection() as db:
+                await db.execute("UPDATE devices SET name = name")
+                assert db.in_transaction
+                await m.log_event("nested", details={"a": 1})
+            return await count_rows(m, "events")
+
+        assert with_shared_db(m, body) == 1
+
+    def test_event_writer_drains_queue_before_stopping(self, m, monkeypatch):
+        async def body(m):
+            monkeypatch.setattr(m, "EVENT_QUEUE", asyncio.Queue())
+            writer = asyncio.create_task(m.event_writer())
+            for i in range(m.EVENT_BATCH_MAX + 5):
+                await m.log_event("queued", details={"i": i})
+            m.enqueue_event("sync_path")
+            m.EVENT_QUEUE.put_nowait(None)
+            await asyncio.wait_for(writer, timeout=5)
+            return await count_rows(m, "events")
+
+        assert with_shared_db(m, body) == m.EVENT_BATCH_MAX + 6
+
+
+# ── Stale processing deadlines ────────────────────────────────
+
+
+class TestStaleProcessingWorker:
+    def test_clears_row_at_deadline_without_spinning(self, m, monkeypatch):
+        loads = []
+        original = m._load_processing_deadlines
+
+        async def counted(db, instance_ids=None):
+            loads.append(instance_ids)
+            await original(db, instance_ids)
+
+        monkeypatch.setattr(m, "_load_processing_deadlines", counted)
+
+        async def body(m):
+            async with m.db_connection() as db:
+                stale = (datetime.now() - timedelta(seconds=m.STALE_PROCESSING_SECONDS - 0.5)).isoformat()
+                await insert_instance(db, "stale", last_activity=stale)
+                await insert_instance(db, "fresh")
+            worker = asyncio.create_task(m.clear_stale_processing_flags())
+            try:
+                await asyncio.sleep(1.5)
+            finally:
+                worker.cancel()
+            async with m.db_connection() as db:
+                cursor = await db.execute("SELECT id, status FROM claude_instances ORDER BY id")
+                return dict(await cursor.fetchall())
+
+        statuses = with_shared_db(m, body)
+        assert statuses == {"fresh": "processing", "stale": "idle"}
+        # Only the startup load; no re-arm loop around the boundary
+        assert loads == [None]
+        assert set(m.PROCESSING_DEADLINES) == {"fresh"}
+
+    def test_rearmed_deadline_is_at_least_a_second_out(self, m):
+        async def body(m):
+            async with m.db_connection() as db:
+                long_stale = (datetime.now() - timedelta(seconds=m.STALE_PROCESSING_SECONDS * 2)).isoformat()
+                await insert_instance(db, "old", last_activity=long_stale)
+                await m._load_processing_deadlines(db, ["old"])
+            return m.PROCESSING_DEADLINES["old"] - time.monotonic()
+
+        assert 0.9 < with_shared_db(m, body) <= 1.0
+
+    def test_mark_processing_wakes_idle_worker(self, m):
+        async def body(m):
+            worker = asyncio.create_task(m.clear_stale_processing_flags())
+            try:
+                await asyncio.sleep(0.05)
+                # No processing rows: the worker is parked on the event
+                assert not m.processing_deadlines_changed.is_set()
+                m.mark_processing("x")
+                assert m.processing_deadlines_changed.is_set()
+                deadline = m.PROCESSING_DEADLINES["x"] - time.monotonic()
+            finally:
+                worker.cancel()
+            return deadline
+
+        assert with_shared_db(m, body) == pytest.approx(m.STALE_PROCESSING_SECONDS, abs=1)
+
+
+# ── Active count / enforce caches ─────────────────────────────
+
+
+class TestActiveCountCache:
+    def test_count_is_cached_until_invalidated(self, m):
+        async def body(m):
+            async with m.db_connection() as db:
+                await insert_instance(db, "a")
+            first = await m.get_active_instance_count()
+            async with m.db_connection() as db:
+                await insert_instance(db, "b", status="idle")
+            cached = await m.get_active_instance_count()
+            m.invalidate_active_count()
+            return first, cached, await m.get_active_instance_count()
+
+        assert with_shared_db(m, body) == (1, 1, 2)
+
+    def test_read_racing_an_invalidation_is_not_cached(self, m, monkeypatch):
+        real_reader = m.db_reader
+
+        @asynccontextmanager
+        async def racing_reader():
+            async with real_reader() as db:
+                # A writer commits and invalidates while this read is in flight
+                m.invalidate_active_count()
+                yield db
+
+        async def body(m):
+            monkeypatch.setattr(m, "db_reader", racing_reader)
+            return await m.get_active_instance_count()
+
+        assert with_shared_db(m, body) == 0
+        assert m.INSTANCE_STATE["active_count"] is None
+
+    def test_enforce_response_reused_until_invalidated(self, m):
+        async def body(m):
+            first = await m.check_window_enforcement_get()
+            second = await m.check_window_enforcement_get()
+            async with m.db_connection() as db:
+                await insert_instance(db, "a")
+            m.invalidate_active_count()
+            third = await m.check_window_enforcement_get()
+            return first, second, third
+
+        first, second, third = with_shared_db(m, body)
+        assert second is first
+        assert first.should_close_distractions
+        assert third.active_instance_count == 1
+        assert not third.should_close_distractions
+
+
+# ── Task locks ────────────────────────────────────────────────
+
+
+class TestTaskLock:
+    TASK = "purge_old_events"
+
+    async def _set_lock(self, m, locked_at: str, locked_at_epoch):
+        async with m.db_connection() as db:
+            await db.execute(
+                "UPDATE task_locks SET locked_at = ?, locked_at_epoch = ?, locked_by = 'other' WHERE task_id = ?",
+                (locked_at, locked_at_epoch, self.TASK),
+            )
+            await db.commit()
+
+    def test_acquire_then_contend_then_release(self, m):
+        async def body(m):
+            results = [await m.acquire_task_lock(self.TASK), await m.acquire_task_lock(self.TASK)]
+            await m.release_task_lock(self.TASK)
+            results.append(await m.acquire_task_lock(self.TASK))
+            return results
+
+        assert with_shared_db(m, body) == [True, False, True]
+
+    def test_stale_lock_is_taken_over(self, m):
+        async def body(m):
+            assert await m.acquire_task_lock(self.TASK)
+            old = int(time.time()) - 3601
+            await self._set_lock(m, datetime.fromtimestamp(old).isoformat(), old)
+            acquired = await m.acquire_task_lock(self.TASK)
+            async with m.db_connection() as db:
+                cursor = await db.execute("SELECT locked_by FROM task_locks WHERE task_id = ?", (self.TASK,))
+                return acquired, (await cursor.fetchone())[0]
+
+        assert with_shared_db(m, body) == (True, "main")
+
+    @pytest.mark.parametrize("age, expected", [(4000, True), (100, False)])
+    def test_legacy_iso_only_locks(self, m, age, expected):
+        async def body(m):
+            assert await m.acquire_task_lock(self.TASK)
+            locked_at = datetime.fromtimestamp(int(time.time()) - age).isoformat()
+            await self._set_lock(m, locked_at, None)
+            return await m.acquire_task_lock(self.TASK)
+
+        assert with_shared_db(m, body) is expected